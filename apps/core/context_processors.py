@@ -6,7 +6,7 @@ def variables(request):
 
     is_filtering = any(value
                        for name, value in request.GET.items()
-                       if name != "page")
+                       if name not in ("page", "cursor", "sort", "pagination"))
     data = {
         "view_name": resolve(request.path_info).url_name,
         "query": request.GET,
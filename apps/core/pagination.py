@@ -0,0 +1,197 @@
+"""
+Paginators that avoid expensive counting.
+
+Keyset (cursor) pagination selects page by values of the last seen row
+instead of offset, so deep pages cost the same as the first one
+and no COUNT is needed
+"""
+from django.core import signing
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import F, Q, QuerySet
+from django.http import Http404, QueryDict
+
+
+class ApproximatePage(Page):
+    """Page of paginator with approximate count, next page is known by extra row"""
+
+    def __init__(self, object_list, number, paginator, has_more: bool) -> None:
+        """Initialize page"""
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self) -> bool:
+        """Return True if there are objects after page"""
+        return self.has_more
+
+    def end_index(self) -> int:
+        """Return 1-based index of last object of page"""
+        return (self.number - 1) * self.paginator.per_page + len(self.object_list)
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator with number of objects known in advance.
+    If count is approximate pages beyond it are allowed
+    and pages are not limited by count
+    """
+
+    def __init__(self, object_list, per_page, count: int, is_exact: bool = True, **kwargs) -> None:
+        """Initialize paginator"""
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+        self.is_approximate = not is_exact
+
+    def validate_number(self, number) -> int:
+        """Validate page number, page may be beyond approximate count"""
+        if not self.is_approximate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError) as error:
+            raise PageNotAnInteger(self.error_messages["invalid_page"]) from error
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number) -> Page:
+        """
+        Return page of objects. If count is approximate one extra
+        row is fetched to find out whether there is next page
+        """
+        if not self.is_approximate:
+            return super().page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        objects = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return ApproximatePage(objects[:self.per_page], number, self,
+                               len(objects) > self.per_page)
+
+
+class CursorPage:
+    """Page of CursorPaginator"""
+
+    is_cursor = True
+
+    def __init__(self, object_list: list, next_cursor: str | None,
+                 previous_cursor: str | None, query: QueryDict, cursor_param: str) -> None:
+        """Initialize page"""
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.query = query
+        self.cursor_param = cursor_param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        """Return True if there is next page"""
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        """Return True if there is previous page"""
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        """Return True if there is next or previous page"""
+        return self.has_next() or self.has_previous()
+
+    def get_next_query(self) -> str:
+        """Return querystring of next page, other parameters are kept"""
+        return self._get_query(self.next_cursor)
+
+    def get_previous_query(self) -> str:
+        """Return querystring of previous page, other parameters are kept"""
+        return self._get_query(self.previous_cursor)
+
+    def get_first_query(self) -> str:
+        """Return querystring of first page, other parameters are kept"""
+        return self._get_query(None)
+
+    def _get_query(self, cursor: str | None) -> str:
+        """Return querystring with cursor replaced"""
+        query = self.query.copy()
+        query.pop(self.cursor_param, None)
+        if cursor is not None:
+            query[self.cursor_param] = cursor
+        return query.urlencode()
+
+
+class CursorPaginator:
+    """
+    Paginate queryset ordered by sort field and primary key.
+    NULL values of sort field go first. Sort field must be indexed,
+    otherwise every page scans whole table
+    """
+
+    salt = "core.pagination.CursorPaginator"
+
+    def __init__(self, queryset: QuerySet, per_page: int, sort_field: str = "pk",
+                 cursor_param: str = "cursor") -> None:
+        """Initialize paginator"""
+        self.queryset = queryset
+        self.per_page = per_page
+        self.sort_field = sort_field
+        self.cursor_param = cursor_param
+
+    def page(self, cursor: str | None, query: QueryDict) -> CursorPage:
+        """Return page that starts after cursor"""
+        position = self.decode(cursor) if cursor else None
+        backwards = position is not None and position["d"] == "prev"
+
+        queryset = self.queryset
+        if position is not None:
+            queryset = queryset.filter(self._get_condition(position["v"], position["id"], backwards))
+        objects = list(queryset.order_by(*self._get_ordering(backwards))[:self.per_page + 1])
+
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if backwards:
+            objects.reverse()
+
+        has_next = has_more if not backwards else True
+        has_previous = position is not None if not backwards else has_more
+
+        next_cursor = self.encode(objects[-1], "next") if has_next and objects else None
+        previous_cursor = self.encode(objects[0], "prev") if has_previous and objects else None
+        return CursorPage(objects, next_cursor, previous_cursor, query, self.cursor_param)
+
+    def encode(self, obj, direction: str) -> str:
+        """Return opaque token of position of object"""
+        value = obj.pk if self.sort_field == "pk" else obj.serializable_value(self.sort_field)
+        return signing.dumps({"v": value, "id": obj.pk, "d": direction}, salt=self.salt, compress=True)
+
+    def decode(self, cursor: str) -> dict:
+        """Return position encoded in token"""
+        try:
+            return signing.loads(cursor, salt=self.salt)
+        except signing.BadSignature as error:
+            raise Http404("Invalid cursor") from error
+
+    def _get_ordering(self, backwards: bool) -> list:
+        """Return ordering of queryset"""
+        if self.sort_field == "pk":
+            return ["-pk"] if backwards else ["pk"]
+        if backwards:
+            return [F(self.sort_field).desc(nulls_last=True), "-pk"]
+        return [F(self.sort_field).asc(nulls_first=True), "pk"]
+
+    def _get_condition(self, value, pk: int, backwards: bool) -> Q:
+        """Return condition of rows after (or before) position"""
+        if self.sort_field == "pk":
+            return Q(pk__lt=pk) if backwards else Q(pk__gt=pk)
+
+        field = self.sort_field
+        is_null = Q(**{f"{field}__isnull": True})
+        if not backwards:
+            if value is None:
+                return (is_null & Q(pk__gt=pk)) | ~is_null
+            return Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk})
+
+        if value is None:
+            return is_null & Q(pk__lt=pk)
+        return Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk}) | is_null
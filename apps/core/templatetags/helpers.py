@@ -18,7 +18,8 @@ def display_errors(field):
     return Markup(html)
 
 
+@pass_context
 @library.render_with("paginator.html")
-def paginator(page_object):
-
-    return {'page_obj': page_object}
+def paginator(context, page_object):
+    """Render links to pages, parameters of current request are kept"""
+    return {'page_obj': page_object, 'request': context.get('request')}
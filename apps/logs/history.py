@@ -0,0 +1,49 @@
+"""
+Queries of change history of table objects.
+History of object is its logs, values of columns changed by each
+log are kept in LogChange
+"""
+from datetime import datetime
+
+from django.db.models import QuerySet
+
+from logs.models import Logs, LogChange
+from logs.writer import log_writer
+
+
+def get_object_history(table, object_id: int) -> QuerySet:
+    """Return logs of object from the oldest with their changes"""
+    return (
+        Logs.objects.filter(content_type_id=log_writer.get_content_type_id(table),
+                            object_id=object_id)
+        .select_related("user")
+        .prefetch_related("changes")
+        .order_by("created_at", "pk")
+    )
+
+
+def get_column_changes(column) -> QuerySet:
+    """Return changes of column from the latest with logs and users who made them"""
+    return (
+        LogChange.objects.filter(column=column.slug)
+        .select_related("log__user")
+        .order_by("-log__created_at", "-log_id")
+    )
+
+
+def get_object_state(table, object_id: int, at: datetime) -> dict | None:
+    """
+    Return values of columns of object at time by replaying its changes,
+    None if object didn't exist then. Values of imported objects are
+    known only from their first logged change
+    """
+    state = None
+    for entry in get_object_history(table, object_id).filter(created_at__lte=at):
+        if entry.action == Logs.Action.DELETE:
+            state = None
+            continue
+        if state is None:
+            state = {}
+        for change in entry.changes.all():
+            state[change.column] = change.new
+    return state
@@ -1,7 +1,9 @@
 """Logs models"""
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.utils import timezone
 
 from table.models import Table
 from user.models import User
@@ -10,14 +12,35 @@ from user.models import User
 class Logs(models.Model):
     """
     Log entity. Contain data about user's actions on tables or fields.
+    Changed values of object are kept in LogChange
     """
 
+    class Action(models.TextChoices):
+        """Action on object"""
+
+        CREATE = "create"
+        UPDATE = "update"
+        DELETE = "delete"
+        IMPORT = "import"
+
+    class Meta:
+        """Model settings"""
+
+        indexes = [
+            models.Index(fields=["content_type", "object_id", "created_at"]),
+            models.Index(fields=["created_at"]),
+        ]
+
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     content_type = models.ForeignKey(ContentType, on_delete=models.SET_NULL, null=True)
     object_id = models.PositiveIntegerField(null=True)
     object = GenericForeignKey("content_type", "object_id")
     message = models.CharField(max_length=256)
     description = models.CharField(max_length=2048)
+    action = models.CharField(max_length=16, choices=Action.choices, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    # token of bulk insert, ids of inserted logs are found by it
+    batch = models.CharField(max_length=32, blank=True, db_index=True)
 
     @property
     def table(self) -> Table:
@@ -26,4 +49,31 @@ class Logs(models.Model):
             return Table.objects.get(slug=self.content_type.model)
         except Table.DoesNotExist:
             return None
-    
\ No newline at end of file
+    
+
+class LogChange(models.Model):
+    """
+    Change of one column of object, values are stored as json.
+    Slugs of columns are unique across tables, so changes
+    of column are found by its slug
+    """
+
+    class Meta:
+        """Model settings"""
+
+        indexes = [
+            models.Index(fields=["column", "log"]),
+        ]
+
+    log = models.ForeignKey(Logs, on_delete=models.CASCADE, related_name="changes")
+    column = models.CharField(max_length=64)
+    old = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    new = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+
+    def __repr__(self) -> str:
+        """Return a string representation of LogChange"""
+        return f"LogChange(column={self.column}, old={self.old!r}, new={self.new!r})"
+
+    def __str__(self) -> str:
+        """Return a string representation of LogChange"""
+        return repr(self)
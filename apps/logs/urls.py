@@ -2,10 +2,12 @@
 from django.urls import path
 from logs.views import LogsListView
 
-from apps.logs.views import LogDetailView
+from apps.logs.views import LogDetailView, ObjectHistoryView, ColumnChangesView
 
 urlpatterns = [
     path('', LogsListView.as_view(), name="logs-list"),
     path('<int:log_id>/', LogDetailView.as_view(), name="log-detail"),
+    path('table/<int:table_id>/<int:object_id>/', ObjectHistoryView.as_view(), name="object-history"),
+    path('column/<int:column_id>/', ColumnChangesView.as_view(), name="column-changes"),
 
 ]
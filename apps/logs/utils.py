@@ -1,28 +1,52 @@
 """Utils"""
-from django.contrib.contenttypes.models import ContentType
-from logs.models import Logs
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
 
+from logs.models import Logs, LogChange
+from logs.writer import log_writer
 
-def log(user, table, object_id, message, description=None):
-    """Log change in db"""
-    content_type = ContentType.objects.get_for_model(table.get_model())
-    Logs.objects.create(
+
+def log(user, table, object_id, message, description=None, action="", changes=None):
+    """
+    Log change in db. Changes are (column slug, old value, new value)
+    triples. Log is written in background after current transaction
+    is committed
+    """
+    entry = Logs(
         user=user,
-        content_type=content_type,
+        content_type_id=log_writer.get_content_type_id(table),
         object_id=object_id,
         message=message,
-        description=description if description else message
+        description=(description if description else message)[:Logs.description.field.max_length],
+        action=action,
     )
+    entry.pending_changes = [
+        LogChange(log=entry, column=column, old=old, new=new)
+        for column, old, new in changes or []
+    ]
+    transaction.on_commit(lambda: log_writer.add(entry))
 
 
-def get_difference_dict(first_dict: dict, second_dict: dict) -> tuple[dict, dict]:
+def get_object_values(object) -> dict:
     """
-    Return dicts of keys that changed value
+    Return values of columns of object by their slugs.
+    Relations are represented by ids and files by names
     """
-    first_difference_dict = {}
-    second_difference_dict = {}
-    for key in first_dict:
-        if first_dict.get(key) != second_dict.get(key):
-            first_difference_dict[key] = first_dict[key]
-            second_difference_dict[key] = second_dict[key]
-    return first_difference_dict, second_difference_dict
+    values = {}
+    for field in object._meta.local_fields:
+        if field.primary_key:
+            continue
+        value = field.value_from_object(object)
+        if isinstance(value, FieldFile):
+            value = value.name or None
+        values[field.name] = value
+    return values
+
+
+def get_changes(before: dict, after: dict) -> list[tuple]:
+    """Return (column slug, old value, new value) triples of values that differ"""
+    return [
+        (column, before.get(column), after.get(column))
+        for column in dict.fromkeys([*before, *after])
+        if before.get(column) != after.get(column)
+    ]
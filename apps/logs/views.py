@@ -1,10 +1,16 @@
 from typing import Any
-from django.shortcuts import render
+from django.contrib import messages
+from django.shortcuts import get_object_or_404, redirect
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
-from django.views.generic import ListView, DetailView
+from django.views.generic import ListView, DetailView, TemplateView
 
+from logs.history import get_column_changes, get_object_history, get_object_state
 from logs.models import Logs
+from table.models import Table, Column
 from logs.forms import LogFilter
+from user.models import TablePermission
 
 
 class LogsListView(ListView):
@@ -26,3 +32,106 @@ class LogDetailView(DetailView):
     model = Logs
     pk_url_kwarg = "log_id"
     template_name = "log_detail.html"
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        changes = list(self.object.changes.all())
+        columns = Column.objects.in_bulk([change.column for change in changes], field_name="slug")
+        context['changes'] = [
+            (columns.get(change.column), change.column, change.old, change.new)
+            for change in changes
+        ]
+        return context
+
+
+class HistoryPermissionMixin:
+    """Allow history of table only to users that can read it"""
+
+    table = None
+
+    def dispatch(self, request, *args, **kwargs):
+        """Check if user has permission"""
+        self.setup_history(**kwargs)
+        if self.has_permission():
+            return super().dispatch(request, *args, **kwargs)
+        messages.error(request, "You have no permission to access this page")
+        return redirect("logs-list")
+
+    def setup_history(self, **kwargs) -> None:
+        """Set table whose history is shown"""
+
+    def has_permission(self) -> bool:
+        """Return True if user can read table"""
+        return self.request.user.has_permission(TablePermission.Operation.READ, self.table)
+
+    def get_readable_columns(self) -> dict[str, Column]:
+        """Return columns of table that user can read by their slugs"""
+        return {
+            column.slug: column
+            for column in self.table.columns.all()
+            if self.request.user.has_permission(TablePermission.Operation.READ, column)
+        }
+
+
+class ObjectHistoryView(HistoryPermissionMixin, TemplateView):
+    """
+    Changes of table object from the oldest, with its state
+    at time given by "at" parameter
+    """
+
+    template_name = "object_history.html"
+
+    def setup_history(self, **kwargs) -> None:
+        """Set table and object whose history is shown"""
+        self.table = get_object_or_404(Table, pk=kwargs["table_id"])
+        self.object_id = kwargs["object_id"]
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        columns = self.get_readable_columns()
+        context['table'] = self.table
+        context['object_id'] = self.object_id
+        context['history'] = [
+            (log, [(columns[change.column], change.old, change.new)
+                   for change in log.changes.all() if change.column in columns])
+            for log in get_object_history(self.table, self.object_id)
+        ]
+
+        at = parse_datetime(self.request.GET.get("at", ""))
+        if at is not None:
+            if timezone.is_naive(at):
+                at = timezone.make_aware(at)
+            state = get_object_state(self.table, self.object_id, at)
+            context['state'] = state and [
+                (column, state[slug]) for slug, column in columns.items() if slug in state
+            ]
+        context['at'] = at
+        return context
+
+
+class ColumnChangesView(HistoryPermissionMixin, ListView):
+    """Changes of column from the latest with users who made them"""
+
+    template_name = "column_changes.html"
+    paginate_by = 15
+
+    def setup_history(self, **kwargs) -> None:
+        """Set column whose changes are shown"""
+        self.column = get_object_or_404(Column.objects.select_related("table"),
+                                        pk=kwargs["column_id"])
+        self.table = self.column.table
+
+    def has_permission(self) -> bool:
+        """Return True if user can read table and column"""
+        return super().has_permission() and self.request.user.has_permission(
+            TablePermission.Operation.READ, self.column
+        )
+
+    def get_queryset(self):
+        return get_column_changes(self.column)
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['column'] = self.column
+        context['table'] = self.table
+        return context
@@ -0,0 +1,140 @@
+"""
+Buffered writer of logs.
+Logs are collected in process and inserted by bulk_create from
+background thread, so requests don't wait for the insert
+"""
+import atexit
+import logging
+import threading
+import uuid
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, connection, transaction
+
+from logs.models import Logs, LogChange
+
+BATCH_SIZE = getattr(settings, "LOGS_BATCH_SIZE", 100)
+FLUSH_INTERVAL = getattr(settings, "LOGS_FLUSH_INTERVAL", 1.0)
+
+logger = logging.getLogger(__name__)
+
+
+class LogWriter:
+    """
+    Buffer of logs. Logs are flushed when batch_size of them is collected
+    or flush_interval seconds passed, and on exit of process
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL) -> None:
+        """Initialize empty writer, thread is started on first log"""
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._entries = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._content_types = {}
+        atexit.register(self.close)
+
+    def get_content_type_id(self, table) -> int:
+        """Return id of content type of table model, ids are cached by table"""
+        content_type_id = self._content_types.get(table.slug)
+        if content_type_id is None:
+            try:
+                content_type = ContentType.objects.get_by_natural_key("table", table.slug)
+            except ContentType.DoesNotExist:
+                content_type = ContentType.objects.get_for_model(table.get_model())
+            content_type_id = self._content_types[table.slug] = content_type.pk
+        return content_type_id
+
+    def add(self, entry: Logs) -> None:
+        """Buffer log, it is written by background thread"""
+        with self._lock:
+            self._entries.append(entry)
+            full = len(self._entries) >= self.batch_size
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def run(self) -> None:
+        """Flush buffer periodically or when it is full"""
+        try:
+            while True:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                close_old_connections()
+                self.flush()
+        finally:
+            connection.close()
+
+    def flush(self) -> int:
+        """
+        Write buffered logs to db. If batch fails, logs are written one by
+        one and logs that can't be written are dropped. Return number of written logs
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._entries = self._entries, []
+            if not entries:
+                return 0
+            try:
+                self.write(entries)
+                return len(entries)
+            except Exception:
+                logger.exception("Batch of %s logs can't be written, writing them one by one",
+                                 len(entries))
+
+            count = 0
+            for entry in entries:
+                self.reset(entry)
+                try:
+                    self.write([entry])
+                    count += 1
+                except Exception:
+                    logger.exception("Log of object %s can't be written, it is dropped",
+                                     entry.object_id)
+            return count
+
+    @staticmethod
+    def reset(entry: Logs) -> None:
+        """Forget ids assigned to log and its changes by failed write"""
+        entry.pk = None
+        entry.batch = ""
+        for change in getattr(entry, "pending_changes", []):
+            change.pk = None
+            change.log_id = None
+
+    def write(self, entries: list[Logs]) -> None:
+        """
+        Insert logs and their changes. If db doesn't return ids of
+        inserted rows, they are selected by token of the batch
+        """
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                Logs.objects.bulk_create(entries, batch_size=self.batch_size)
+            else:
+                batch = uuid.uuid4().hex
+                for entry in entries:
+                    entry.batch = batch
+                Logs.objects.bulk_create(entries, batch_size=self.batch_size)
+                # ids of bulk inserted rows grow in order of rows
+                ids = Logs.objects.filter(batch=batch).order_by("pk").values_list("pk", flat=True)
+                for entry, pk in zip(entries, ids):
+                    entry.pk = pk
+            changes = []
+            for entry in entries:
+                for change in getattr(entry, "pending_changes", []):
+                    change.log = entry
+                    changes.append(change)
+            LogChange.objects.bulk_create(changes, batch_size=self.batch_size)
+
+    def close(self) -> None:
+        """Write remaining logs, called on exit of process"""
+        self.flush()
+
+
+log_writer = LogWriter()
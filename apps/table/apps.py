@@ -6,9 +6,11 @@ class TableConfig(AppConfig):
     name = 'table'
 
     def ready(self):
-        from table.models import Table
-        for table in Table.objects.all():
-            table.get_model()
+        """
+        Make dynamic models and their lookup channels lazy,
+        they are built on first access, and connect signals
+        """
+        import table.signals  # noqa: F401
+        from table.utils.model_registry import model_registry
 
-        for table in Table.objects.all():
-            table.register_ajax_lookup()
+        model_registry.install(self)
@@ -4,7 +4,7 @@ from django import forms
 from django.forms import inlineformset_factory
 from django.utils.translation import gettext_lazy as _
 
-from apps.core.forms import BaseModelForm, BaseFilterSet
+from apps.core.forms import BaseForm, BaseModelForm, BaseFilterSet
 from table.models import Table, Column
 
 
@@ -55,3 +55,9 @@ class ColumnEditForm(BaseModelForm):
 
 
 ColumnFormSet = inlineformset_factory(Table, Column, form=ColumnEditForm, extra=1)
+
+
+class ImportForm(BaseForm):
+    """Form for importing objects from file"""
+
+    file = forms.FileField(label=_("CSV or XLSX file"))
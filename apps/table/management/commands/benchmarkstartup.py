@@ -0,0 +1,62 @@
+"""
+Command to measure startup cost of table app depending on number of tables
+"""
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from table.models import Table, Column
+
+BENCHMARK_PREFIX = "startup_benchmark_"
+
+
+class Command(BaseCommand):
+    """Startup benchmark command"""
+
+    help = ("measure time and queries of table app startup and of building "
+            "first model for different numbers of tables. Tables are created "
+            "in transaction that is rolled back")
+
+    def add_arguments(self, parser):
+        """Add command arguments"""
+        parser.add_argument("--tables", type=int, nargs="+", default=[10, 100, 1000],
+                            help="numbers of tables to measure startup with")
+        parser.add_argument("--columns", type=int, default=5,
+                            help="number of columns of each table")
+
+    def handle(self, *args, **options):
+        """Handle command execution"""
+        self.stdout.write(f"{'tables':>8} {'startup ms':>12} {'queries':>8} {'first model ms':>15}")
+        for count in options["tables"]:
+            with transaction.atomic():
+                tables = self.create_tables(count, options["columns"])
+                startup, queries = self.measure(apps.get_app_config("table").ready)
+                first_model, _ = self.measure(lambda: apps.get_model("table", tables[0].slug))
+                transaction.set_rollback(True)
+            self.stdout.write(f"{count:>8} {startup:>12.1f} {queries:>8} {first_model:>15.1f}")
+
+    def create_tables(self, count: int, columns: int) -> list[Table]:
+        """Create tables with text and integer columns"""
+        Table.objects.bulk_create(
+            [Table(name=f"{BENCHMARK_PREFIX}{index}") for index in range(count)]
+        )
+        tables = list(Table.objects.filter(name__startswith=BENCHMARK_PREFIX))
+        Column.objects.bulk_create([
+            Column(name=f"column {index}", table=table,
+                   dtype=Column.DType.TEXT if index % 2 else Column.DType.INTEGER)
+            for table in tables
+            for index in range(columns)
+        ])
+        return tables
+
+    @staticmethod
+    def measure(function) -> tuple[float, int]:
+        """Return milliseconds and number of queries spent by function"""
+        with CaptureQueriesContext(connection) as queries:
+            started_at = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - started_at
+        return elapsed * 1000, len(queries.captured_queries)
@@ -0,0 +1,57 @@
+"""
+Command to load big CSV or XLSX file to table by process pool
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from table.models import Table, TableImport
+from table.utils.bulk_load import BulkLoader, CHUNK_SIZE, WORKERS
+from table.utils.importer import ImportFileError
+
+
+class Command(BaseCommand):
+    """Bulk load command"""
+
+    help = ("load CSV or XLSX file to dynamic table in parallel, "
+            "interrupted load can be resumed with --resume")
+
+    def add_arguments(self, parser):
+        """Add command arguments"""
+        parser.add_argument("table", help="name of table")
+        parser.add_argument("path", help="path to CSV or XLSX file")
+        parser.add_argument("--workers", type=int, default=WORKERS,
+                            help="number of worker processes (and db connections)")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                            help="number of rows committed at once")
+        parser.add_argument("--resume", type=int, metavar="IMPORT_ID",
+                            help="id of interrupted load to continue")
+
+    def handle(self, *args, **options):
+        """Handle command execution"""
+        table = Table.objects.filter(name=options["table"]).first()
+        if table is None:
+            raise CommandError(f"Table {options['table']} does not exist")
+
+        table_import = None
+        if options["resume"] is not None:
+            table_import = TableImport.objects.filter(
+                pk=options["resume"], table=table, chunk_size__gt=0
+            ).exclude(status=TableImport.Status.DONE).first()
+            if table_import is None:
+                raise CommandError(f"There is no interrupted load {options['resume']} of {table.name}")
+
+        loader = BulkLoader(table, workers=options["workers"], chunk_size=options["chunk_size"])
+        try:
+            with open(options["path"], "rb") as file:
+                table_import = loader.run(file, os.path.basename(options["path"]), table_import)
+        except ImportFileError as error:
+            raise CommandError(error) from error
+        except Exception as error:
+            raise CommandError(f"Load failed: {error}. Continue it with --resume "
+                               f"{loader.table_import.pk}") from error
+
+        self.stdout.write(f"{table_import.rows_imported} of {table_import.rows_total} rows imported, "
+                          f"{table_import.rows_failed} rows failed")
+        if table_import.error_report:
+            self.stdout.write(f"Error report: {table_import.error_report.path}")
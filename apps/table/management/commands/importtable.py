@@ -0,0 +1,39 @@
+"""
+Command to import objects to table from CSV or XLSX file
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from table.models import Table, TableImport
+from table.utils.importer import TableImporter, BATCH_SIZE
+
+
+class Command(BaseCommand):
+    """Import table objects command"""
+
+    help = "import objects to dynamic table from CSV or XLSX file"
+
+    def add_arguments(self, parser):
+        """Add command arguments"""
+        parser.add_argument("table", help="name of table")
+        parser.add_argument("path", help="path to CSV or XLSX file")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                            help="number of rows validated and inserted at once")
+
+    def handle(self, *args, **options):
+        """Handle command execution"""
+        table = Table.objects.filter(name=options["table"]).first()
+        if table is None:
+            raise CommandError(f"Table {options['table']} does not exist")
+
+        with open(options["path"], "rb") as file:
+            table_import = TableImporter(table, batch_size=options["batch_size"]).run(
+                file, os.path.basename(options["path"]))
+
+        if table_import.status == TableImport.Status.FAILED:
+            raise CommandError(table_import.error)
+        self.stdout.write(f"{table_import.rows_imported} of {table_import.rows_total} rows imported, "
+                          f"{table_import.rows_failed} rows failed")
+        if table_import.error_report:
+            self.stdout.write(f"Error report: {table_import.error_report.path}")
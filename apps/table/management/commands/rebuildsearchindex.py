@@ -0,0 +1,29 @@
+"""
+Command to rebuild search indexes of dynamic tables
+"""
+from django.core.management.base import BaseCommand
+
+from table.models import Table
+from table.utils import global_search
+from table.utils.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """Rebuild search index command"""
+
+    help = "index objects of dynamic tables for column search and global search"
+
+    def add_arguments(self, parser):
+        """Add command arguments"""
+        parser.add_argument("tables", nargs="*", help="names of tables, all tables by default")
+
+    def handle(self, *args, **options):
+        """Handle command execution"""
+        tables = Table.objects.all()
+        if options["tables"]:
+            tables = tables.filter(name__in=options["tables"])
+        backend = get_search_backend()
+        for table in tables:
+            backend.rebuild(table)
+            count = global_search.rebuild(table)
+            self.stdout.write(f"{table.name}: {count}")
@@ -0,0 +1,19 @@
+"""
+Command to recount objects of dynamic tables
+"""
+from django.core.management.base import BaseCommand
+
+from table.models import Table
+from table.utils.row_count import recount_rows
+
+
+class Command(BaseCommand):
+    """Recount rows command"""
+
+    help = "count objects of dynamic tables exactly and store counts"
+
+    def handle(self, *args, **options):
+        """Handle command execution"""
+        for table in Table.objects.all():
+            count = recount_rows(table)
+            self.stdout.write(f"{table.name}: {count}")
@@ -0,0 +1,36 @@
+"""
+Command to run background exports of tables
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from table.utils.export import ExportRunner, cleanup_exports, get_claimable_exports
+
+
+class Command(BaseCommand):
+    """Run queued exports"""
+
+    help = ("run queued exports and exports interrupted for TABLE_EXPORT_STALE_AFTER "
+            "seconds, remove expired exports")
+
+    def add_arguments(self, parser):
+        """Add command arguments"""
+        parser.add_argument("--loop", action="store_true",
+                            help="keep waiting for new exports")
+        parser.add_argument("--interval", type=float, default=5,
+                            help="seconds between checks for new exports")
+
+    def handle(self, *args, **options):
+        """Handle command execution"""
+        while True:
+            cleanup_exports()
+            for job in get_claimable_exports():
+                runner = ExportRunner(job)
+                if not runner.claim():
+                    continue
+                self.stdout.write(f"Exporting {job.table.name} to {job.format}")
+                runner.run()
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
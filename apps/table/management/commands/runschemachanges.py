@@ -0,0 +1,19 @@
+"""
+Command to resume online schema changes interrupted by restart
+"""
+from django.core.management.base import BaseCommand
+
+from table.models import SchemaChangeJob
+from table.utils.online_schema import OnlineSchemaChange
+
+
+class Command(BaseCommand):
+    """Run unfinished schema changes"""
+
+    help = "resume unfinished online schema changes of dynamic tables"
+
+    def handle(self, *args, **options):
+        """Handle command execution"""
+        for job in SchemaChangeJob.objects.exclude(status=SchemaChangeJob.Status.DONE):
+            self.stdout.write(f"Running schema change of {job.table.name}")
+            OnlineSchemaChange(job).run()
@@ -1,5 +1,6 @@
 """
-Command to safely migrate static models as well as dynammic
+Command to safely migrate static models.
+Dynamic models are loaded as unmanaged, so their tables are left untouched
 """
 from django.core.management.base import BaseCommand
 from table.utils.utils import migrate
@@ -8,7 +9,7 @@ from table.utils.utils import migrate
 class Command(BaseCommand):
     """Safe sync command"""
 
-    help = "safely migrate static and dynammic models"
+    help = "safely migrate static models"
 
     def handle(self, *args, **options):
         """Handle command execution"""
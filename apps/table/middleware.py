@@ -0,0 +1,18 @@
+"""Middleware of table app"""
+
+from table.utils.utils import sync_schema
+
+
+class SchemaSyncMiddleware:
+    """
+    Keep dynamic models of this worker in sync with
+    schema changes made by other workers
+    """
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request, *args, **kwargs):
+        if not request.path.startswith('/static/'):
+            sync_schema()
+        return self.get_response(request)
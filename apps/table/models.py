@@ -8,15 +8,18 @@ import time
 import random
 import hashlib
 import traceback
+from datetime import timedelta
 from typing import Type
 
 import django_filters
-from ajax_select import registry
+from django_filters.utils import label_for_filter
 from ajax_select.fields import AutoCompleteSelectWidget
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
-from django.db.models import QuerySet
+from django.db import connection, models
+from django.db.models import F, QuerySet
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 from table.utils.column_handlers import (
@@ -30,6 +33,7 @@ from table.utils.dynamic_model import (
     DynamicModelFormMixin,
     DynamicModelFilterSetMixin,
 )
+from table.utils.model_registry import model_registry
 from core.forms import BaseModelForm
 from user.models import TablePermission, User
 
@@ -49,6 +53,7 @@ class Table(models.Model):
     description = models.CharField(_("Table descriptioni"), max_length=256, null=True)
     slug = models.CharField(_("Slug"), max_length=64, unique=True)
     options = models.JSONField(_("Options"), default=dict)
+    schema_version = models.PositiveIntegerField(_("Schema version"), default=0)
 
     def __init__(self, *args, **kwargs) -> None:
         """Initialize table"""
@@ -62,30 +67,92 @@ class Table(models.Model):
         """Return a string representation of Table"""
         return repr(self)
 
+    def save(self, *args, **kwargs) -> None:
+        """Save table and bump its schema version"""
+        if self.pk is not None:
+            self.schema_version += 1
+        super().save(*args, **kwargs)
+        SchemaGeneration.bump()
+
+    def delete(self, *args, **kwargs):
+        """Delete table and remove its model from registry"""
+        model_registry.forget(self)
+        result = super().delete(*args, **kwargs)
+        SchemaGeneration.bump()
+        return result
+
+    def bump_schema_version(self) -> None:
+        """
+        Increment schema version, so model of table is rebuilt
+        on next access
+        """
+        Table.objects.filter(pk=self.pk).update(schema_version=F("schema_version") + 1)
+        self.refresh_from_db(fields=["schema_version"])
+        SchemaGeneration.bump()
+
     def __repr__(self) -> str:
         """Return a string representation of Table"""
         return f"Table(name={self.name})"
 
-    @property
-    def searchable_column(self):
-        return self.columns.filter(dtype=Column.DType.TEXT).first() or self.columns.first()
+    @cached_property
+    def searchable_column(self) -> Column | None:
+        """Return column that represents objects of table"""
+        return self.pick_searchable_column(self.get_columns())
+
+    @staticmethod
+    def pick_searchable_column(columns: list[Column]) -> Column | None:
+        """Return first text column, or first column if there are no text columns"""
+        text_columns = [column for column in columns if column.dtype == Column.DType.TEXT]
+        return (text_columns or columns or [None])[0]
 
     def get_absolute_url(self) -> str:
         """Return url to Table edit page"""
         return reverse("table-edit", kwargs={"table_id": self.id})
 
-    def get_displayable_columns(self, user) -> QuerySet[Column]:
+    def get_columns(self) -> list[Column]:
+        """
+        Return columns that are present in model of table.
+        Columns that are being added by online schema change
+        are excluded until the change is finished
+        """
+        field_names = {field.name for field in self.get_model()._meta.local_fields}
+        return [column for column in self.columns.all() if column.slug in field_names]
+
+    def get_displayable_columns(self, user) -> list[Column]:
         """Return list of columns that can be displayed in talbe"""
         displayable_columns = [
             column
-            for column in self.columns.filter(is_displayable=True)
-            if user.has_permission(TablePermission.Operation.READ, column)
+            for column in self.get_columns()
+            if column.is_displayable
+            and user.has_permission(TablePermission.Operation.READ, column)
         ]
         return displayable_columns
 
-    def get_filterable_columns(self) -> QuerySet[Column]:
+    def get_filterable_columns(self) -> list[Column]:
         """Return list of columns that can be present in filters"""
-        return self.columns.all()
+        return self.get_columns()
+
+    def optimize_queryset(self, queryset: QuerySet, columns: list[Column]) -> QuerySet:
+        """
+        Load only given columns of objects. Objects of relation columns
+        are fetched in the same query, together with values needed to display them
+        """
+        fields = ["id"]
+        related_fields = []
+        for column in columns:
+            if column.dtype != Column.DType.RELATION:
+                fields.append(column.slug)
+                continue
+
+            related_fields.append(column.slug)
+            related_table = column.get_related_table()
+            searchable_column = related_table.searchable_column if related_table else None
+            if searchable_column is None or searchable_column.dtype == Column.DType.RELATION:
+                fields.append(column.slug)
+            else:
+                fields.append(f"{column.slug}__{searchable_column.slug}")
+
+        return queryset.select_related(*related_fields).only(*fields)
 
     def add_column(self, column_name: str, dtype: int) -> None:
         """Add new column to table"""
@@ -103,14 +170,54 @@ class Table(models.Model):
         raise ValueError("You must pass column object either column name to delete it.")
 
     def get_model(self) -> models.Model:
-        """Create model"""
+        """Return model of table from registry"""
+        return model_registry.get_model(self)
+
+    def get_indexes(self) -> list[dict]:
+        """Return indexes of table in db with names of their columns"""
+        model = self.get_model()
+        column_names = {
+            model._meta.get_field(column.slug).column: column.name
+            for column in self.get_columns()
+        }
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        indexes = [
+            {
+                "name": name,
+                "columns": [column_names.get(column, column) for column in constraint["columns"]],
+                "unique": constraint["unique"],
+            }
+            for name, constraint in constraints.items()
+            if constraint["index"] and not constraint["primary_key"]
+        ]
+        return sorted(indexes, key=lambda index: index["columns"])
+
+    def get_active_schema_change(self) -> SchemaChangeJob | None:
+        """Return unfinished online schema change of table"""
+        return self.schema_changes.exclude(status=SchemaChangeJob.Status.DONE).first()
+
+    def build_model(self, name: str | None = None, include_pending: bool = False) -> models.Model:
+        """
+        Create model. Columns that are being added by online schema change
+        are skipped unless include_pending is set.
+        Model with other name is created with its own db table and
+        without reverse relations, it is used for shadow tables
+        """
+        name = name or self.slug
+        schema_change = self.get_active_schema_change()
+        pending_columns = []
+        if schema_change is not None and not include_pending:
+            pending_columns = schema_change.pending_columns
 
         class Meta:
             """Meta for dynammic_model"""
 
         # we must set the app_label and table name
         setattr(Meta, "app_label", "table")
-        setattr(Meta, "db_table", self.slug)
+        setattr(Meta, "db_table", name)
+        # schema of table is changed by table.utils.utils.migrate_table
+        setattr(Meta, "managed", False)
 
         # Update Meta with any options that were provided
         if self.options is not None:
@@ -120,29 +227,66 @@ class Table(models.Model):
         # Set up a dictionary to simulate declarations within a class
         attrs = {"__module__": "apps.table", "Meta": Meta}
 
+        columns = [column for column in self.columns.all() if column.slug not in pending_columns]
+        # searchable column is used for ordering and search of lookups
+        searchable_column = self.pick_searchable_column(columns)
+
         # Add in any fields that were provided
-        for column in self.columns.all():
+        for column in columns:
             try:
-                attrs[column.slug] = column.get_django_model_field()
+                field = column.get_django_model_field()
             except Exception as ex:
                 traceback.print_exc()
+                continue
+            if name != self.slug and field.is_relation:
+                field.remote_field.related_name = "+"
+            if column == searchable_column and column.handler.indexable:
+                field.db_index = True
+            attrs[column.slug] = field
+
+        # Drop previous version of model to avoid reloading warning
+        model_registry.unregister(name)
 
         # Create the class, which automatically triggers ModelBase processing
-        model = type(self.slug, (DynamicModelMixin, models.Model), attrs)
+        model = type(name, (DynamicModelMixin, models.Model), attrs)
         setattr(model, "table", self)
+        if schema_change is not None and name == self.slug:
+            setattr(model, "schema_change_id", schema_change.id)
         # Create an Admin class if admin options were provided
         return model
 
-    def get_model_form(self, user: User) -> BaseModelForm:
+    def get_model_form(self, user: User) -> type[BaseModelForm]:
         """
-        Create model form for table.
-        Form for adding and editing
+        Return model form for table.
+        Form for adding and editing. Form classes are built once per
+        schema version for each set of columns user can read and write
+        """
+        displayable_columns = self.get_displayable_columns(user)
+        readonly_columns = [
+            column
+            for column in displayable_columns
+            if not user.has_permission(TablePermission.Operation.WRITE, column)
+        ]
+        fingerprint = hashlib.md5(" ".join(
+            [column.slug for column in displayable_columns] + ["|"]
+            + [column.slug for column in readonly_columns]
+        ).encode()).hexdigest()
+
+        return model_registry.get_artifact(
+            self, f"model_form:{fingerprint}",
+            lambda: self.build_model_form(displayable_columns, readonly_columns),
+        )
+
+    def build_model_form(self, displayable_columns: list[Column],
+                         readonly_columns: list[Column]) -> type[BaseModelForm]:
+        """
+        Create model form for table with given displayable
+        and readonly columns
         """
 
         class Meta:
             """Meta for talbe's model form"""
 
-        displayable_columns = self.get_displayable_columns(user)
         displayable_column_names = [field.slug for field in displayable_columns]
         setattr(Meta, "model", self.get_model())
         setattr(Meta, "fields", displayable_column_names)
@@ -153,28 +297,39 @@ class Table(models.Model):
             {"Meta": Meta},
         )
 
-        readonly_columns = [
-            column
+        # channels of relation widgets are resolved once, not per form
+        autocomplete_channels = {
+            column.slug: ContentType.objects.get_for_id(column.settings.get("content_type_id")).model
             for column in displayable_columns
-            if not user.has_permission(TablePermission.Operation.WRITE, column)
-        ]
-        setattr(model_form, "columns", self.columns.all())
+            if column.dtype == Column.DType.RELATION
+        }
+        setattr(model_form, "columns", self.get_columns())
         setattr(model_form, "readlonly_columns", readonly_columns)
+        setattr(model_form, "autocomplete_channels", autocomplete_channels)
 
         return model_form
 
-    def register_ajax_lookup(self):
-        """Add ajax lookup to table"""
+    def get_lookup_channel(self) -> type[DynamicModelLookup]:
+        """Return ajax lookup channel of table, it is built once per schema version"""
+        return model_registry.get_artifact(self, "lookup", self.build_lookup_channel)
+
+    def build_lookup_channel(self) -> type[DynamicModelLookup]:
+        """Create ajax lookup channel for table"""
 
         attrs = {
             'model': self.get_model(),
             'searchable_column': self.searchable_column
         }
 
-        lookup_channel = type(f"{self.slug}LookupChannel", (DynamicModelLookup, ), attrs)
-        registry.register({self.slug: lookup_channel})
+        return type(f"{self.slug}LookupChannel", (DynamicModelLookup, ), attrs)
+
+    def get_filterset(self) -> type[django_filters.FilterSet]:
+        """
+        Return FilterSet class for table, it is built once per schema version
+        """
+        return model_registry.get_artifact(self, "filterset", self.build_filterset)
 
-    def get_filterset(self) -> django_filters.FilterSet:
+    def build_filterset(self) -> type[django_filters.FilterSet]:
         """
         Create FilterSet class for table
         """
@@ -193,20 +348,23 @@ class Table(models.Model):
 
         for column in filterable_columns:
             if column.dtype == Column.DType.RELATION and fields_filters[column.slug]:
-                content_type = ContentType.objects.get(id=column.settings.get('content_type_id'))
-                table = Table.objects.get(slug=content_type.model)
-
-                def filter_function(cls, queryset, _, value):
-                    return queryset.filter(**{f"{column.slug}_id": value.id})
-
-                filter_method_name = f"{column.slug}_filter"
+                table = column.get_related_table()
+                if table is None:
+                    continue
+                # model of related table is taken when filterset is bound,
+                # so filterset doesn't keep its stale version
                 attrs[column.slug] = django_filters.ModelChoiceFilter(
-                    queryset=table.get_model().objects.all(),
+                    queryset=lambda request, table=table: table.get_model().objects.all(),
                     widget=AutoCompleteSelectWidget(table.slug),
                     label=column.name,
-                    method=filter_method_name)
+                    method="relation_filter")
 
-                attrs[filter_method_name] = filter_function
+            if column.dtype == Column.DType.TEXT and "contains" in fields_filters[column.slug]:
+                # substring search is done by search backend instead of LIKE scan
+                attrs[f"{column.slug}__contains"] = django_filters.CharFilter(
+                    field_name=column.slug,
+                    label=label_for_filter(self.get_model(), column.slug, "contains"),
+                    method="search_filter")
 
         filterset = type(
             f"table_{self.slug}FilterSet",
@@ -221,14 +379,31 @@ class Table(models.Model):
         Return list of tables that are dependent on this table
         through relation
         """
-        content_type = ContentType.objects.get(model=self.slug)
-        relation_columns = Column.objects.filter(dtype=Column.DType.RELATION)
-        dependent_tables = []
-        for relation_columns in relation_columns:
-            related_content_type_id = relation_columns.settings.get('content_type_id')
-            if int(related_content_type_id) == content_type.id:
-                dependent_tables.append(relation_columns.table)
-        return dependent_tables
+        return list(Table.objects.filter(dependencies__target=self).distinct().order_by("pk"))
+
+    def get_referenced_tables(self) -> list["Table"]:
+        """Return other tables that relation columns of this table refer to"""
+        return list(
+            Table.objects.filter(dependents__table=self).exclude(pk=self.pk).distinct().order_by("pk")
+        )
+
+    def get_transitive_dependent_tables(self) -> list["Table"]:
+        """
+        Return tables that depend on this table directly or through
+        other tables, graph is walked by one query per level
+        """
+        found, frontier = set(), {self.pk}
+        while frontier:
+            frontier = set(
+                TableDependency.objects.filter(target_id__in=frontier)
+                .values_list("table_id", flat=True)
+            ) - found
+            found |= frontier
+        return list(Table.objects.filter(pk__in=found).order_by("pk"))
+
+    def has_dependent_tables(self) -> bool:
+        """Return True if any table refers to this table"""
+        return TableDependency.objects.filter(target=self).exists()
 
     def get_related_objects_of_table(self, table: "Table", object) -> QuerySet:
         model = self.get_model()
@@ -276,12 +451,28 @@ class Column(models.Model):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        # deletion collector loads columns with deferred fields
+        if self.get_deferred_fields():
+            return
+
         if not self.slug:
             code = time.time_ns() + random.randint(1, 10)
             self.slug = "column_" + hashlib.md5(str(code).encode()).hexdigest()
 
         self.handler = self.HANDLERS[self.dtype](self.name, self.slug, self.settings)
 
+    def save(self, *args, **kwargs) -> None:
+        """Save column, update dependency graph and bump schema version of its table"""
+        super().save(*args, **kwargs)
+        TableDependency.sync(self)
+        self.table.bump_schema_version()
+
+    def delete(self, *args, **kwargs):
+        """Delete column and bump schema version of its table"""
+        result = super().delete(*args, **kwargs)
+        self.table.bump_schema_version()
+        return result
+
     def __repr__(self) -> str:
         """Return a string representation of Column"""
         return f"Column(table={self.table.name}, name={self.name})"
@@ -289,6 +480,14 @@ class Column(models.Model):
     def __str__(self) -> str:
         return repr(self)
 
+    def get_related_table(self) -> Table | None:
+        """
+        Return table that relation column refers to.
+        None if column refers to other model, i.e User
+        """
+        content_type = ContentType.objects.get_for_id(self.settings.get("content_type_id"))
+        return Table.objects.filter(slug=content_type.model).first()
+
     def get_django_model_field(self) -> Type[models.Field]:
         """
         Return django field column depending on column type
@@ -307,3 +506,374 @@ class Column(models.Model):
         Return css class to format this field
         """
         return self.handler.get_css_formating_class()
+
+
+class TableDependency(models.Model):
+    """
+    Edge of dependency graph of tables: relation column of table
+    refers to target table. Maintained on column save, edges
+    are deleted together with their column
+    """
+
+    column = models.OneToOneField(Column, on_delete=models.CASCADE, related_name="dependency")
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="dependencies")
+    target = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="dependents")
+
+    def __repr__(self) -> str:
+        """Return a string representation of TableDependency"""
+        return f"TableDependency(table={self.table_id}, target={self.target_id})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    @classmethod
+    def sync(cls, column: Column) -> None:
+        """Create, update or delete edge of column"""
+        target = column.get_related_table() if column.dtype == Column.DType.RELATION else None
+        if target is None:
+            cls.objects.filter(column=column).delete()
+            return
+        cls.objects.update_or_create(column=column,
+                                     defaults={"table_id": column.table_id, "target": target})
+
+    @classmethod
+    def rebuild(cls) -> None:
+        """Recreate edges of all relation columns"""
+        columns = list(Column.objects.filter(dtype=Column.DType.RELATION))
+        cls.objects.exclude(column__in=columns).delete()
+        for column in columns:
+            cls.sync(column)
+
+
+class SchemaGeneration(models.Model):
+    """
+    Global counter of schema changes of dynamic tables.
+    Each worker compares it with generation of its model registry
+    to find out that cached models are stale
+    """
+
+    value = models.PositiveBigIntegerField(_("Value"), default=0)
+
+    @classmethod
+    def current(cls) -> int:
+        """Return current generation"""
+        return cls.objects.filter(pk=1).values_list("value", flat=True).first() or 0
+
+    @classmethod
+    def bump(cls) -> None:
+        """Increment generation"""
+        if not cls.objects.filter(pk=1).update(value=F("value") + 1):
+            cls.objects.get_or_create(pk=1, defaults={"value": 1})
+
+
+class SchemaChangeJob(models.Model):
+    """
+    Online schema change of table. Rows are copied to shadow
+    table with new schema in batches, then tables are swapped
+    """
+
+    class Status(models.IntegerChoices):
+        """Status of schema change"""
+
+        PENDING = 0, _("Pending")
+        COPYING = 1, _("Copying")
+        DONE = 2, _("Done")
+        FAILED = 3, _("Failed")
+
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="schema_changes")
+    status = models.IntegerField(_("Status"), choices=Status, default=Status.PENDING)
+    shadow_table = models.CharField(_("Shadow table"), max_length=128)
+    pending_columns = models.JSONField(_("Pending columns"), default=list)
+    copied_columns = models.JSONField(_("Copied columns"), default=list)
+    rows_total = models.PositiveBigIntegerField(_("Rows total"), default=0)
+    rows_copied = models.PositiveBigIntegerField(_("Rows copied"), default=0)
+    last_copied_id = models.BigIntegerField(_("Last copied id"), default=0)
+    error = models.TextField(_("Error"), blank=True, default="")
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+
+    def __repr__(self) -> str:
+        """Return a string representation of SchemaChangeJob"""
+        return f"SchemaChangeJob(table={self.table_id}, status={self.status})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    @property
+    def progress(self) -> int:
+        """Return percent of copied rows"""
+        if not self.rows_total:
+            return 0
+        return min(100, self.rows_copied * 100 // self.rows_total)
+
+
+class SchemaChangeRow(models.Model):
+    """
+    Object written while its table is copied by online schema change.
+    Current state of object is copied to shadow table by the job
+    """
+
+    job = models.ForeignKey(SchemaChangeJob, on_delete=models.CASCADE, related_name="changed_rows")
+    object_id = models.BigIntegerField(_("Object id"))
+
+    def __repr__(self) -> str:
+        """Return a string representation of SchemaChangeRow"""
+        return f"SchemaChangeRow(job={self.job_id}, object_id={self.object_id})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+
+class TableRowCount(models.Model):
+    """
+    Number of objects in table, maintained on object creation
+    and deletion, so list pages don't count rows
+    """
+
+    table = models.OneToOneField(Table, on_delete=models.CASCADE, related_name="row_count")
+    count = models.BigIntegerField(_("Count"), default=0)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+
+    def __repr__(self) -> str:
+        """Return a string representation of TableRowCount"""
+        return f"TableRowCount(table={self.table_id}, count={self.count})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+
+class TableDataVersion(models.Model):
+    """
+    Counter of changes of table objects, incremented on every
+    object save and deletion. Used to find out that result
+    computed from table data is stale
+    """
+
+    table = models.OneToOneField(Table, on_delete=models.CASCADE, related_name="data_version")
+    value = models.PositiveBigIntegerField(_("Value"), default=0)
+
+    def __repr__(self) -> str:
+        """Return a string representation of TableDataVersion"""
+        return f"TableDataVersion(table={self.table_id}, value={self.value})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    @classmethod
+    def current(cls, table: Table) -> int:
+        """Return current data version of table"""
+        return cls.objects.filter(table_id=table.pk).values_list("value", flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, table: Table) -> None:
+        """Increment data version of table"""
+        if not cls.objects.filter(table_id=table.pk).update(value=F("value") + 1):
+            cls.objects.get_or_create(table_id=table.pk, defaults={"value": 1})
+
+
+class ExportJob(models.Model):
+    """
+    Export of table objects run in background. Finished export is
+    reused while table data, schema and filters stay the same
+    """
+
+    class Status(models.IntegerChoices):
+        """Status of export"""
+
+        PENDING = 0, _("Pending")
+        RUNNING = 1, _("Running")
+        DONE = 2, _("Done")
+        FAILED = 3, _("Failed")
+
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="exports")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="exports")
+    status = models.IntegerField(_("Status"), choices=Status, default=Status.PENDING)
+    format = models.CharField(_("Format"), max_length=16)
+    query = models.TextField(_("Filter query"), blank=True, default="")
+    name = models.CharField(_("File name"), max_length=256)
+    file = models.FileField(_("File"), upload_to="exports/", blank=True)
+    schema_version = models.PositiveIntegerField(_("Schema version"))
+    data_version = models.PositiveBigIntegerField(_("Data version"))
+    rows_total = models.PositiveBigIntegerField(_("Rows total"), default=0)
+    rows_written = models.PositiveBigIntegerField(_("Rows written"), default=0)
+    last_exported_id = models.BigIntegerField(_("Last exported id"), default=0)
+    file_size = models.PositiveBigIntegerField(_("File size"), default=0)
+    error = models.TextField(_("Error"), blank=True, default="")
+    started_at = models.DateTimeField(_("Started at"), null=True)
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+
+    def __repr__(self) -> str:
+        """Return a string representation of ExportJob"""
+        return f"ExportJob(table={self.table_id}, format={self.format}, status={self.status})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    def get_absolute_url(self) -> str:
+        """Return url to export page"""
+        return reverse("export-detail", kwargs={"table_id": self.table_id, "export_id": self.pk})
+
+    @property
+    def progress(self) -> int:
+        """Return percent of written rows"""
+        if self.status == self.Status.DONE:
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(100, self.rows_written * 100 // self.rows_total)
+
+    @property
+    def eta(self) -> timedelta | None:
+        """Return estimated time left, None if it is unknown yet"""
+        if self.status != self.Status.RUNNING or not self.rows_written or self.started_at is None:
+            return None
+        elapsed = timezone.now() - self.started_at
+        rows_left = max(self.rows_total - self.rows_written, 0)
+        return timedelta(seconds=round(elapsed.total_seconds() * rows_left / self.rows_written))
+
+
+class TableImport(models.Model):
+    """
+    Import of objects from file to table. Rows that failed
+    validation are saved to error report
+    """
+
+    class Status(models.IntegerChoices):
+        """Status of import"""
+
+        RUNNING = 0, _("Running")
+        DONE = 1, _("Done")
+        FAILED = 2, _("Failed")
+
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="imports")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="imports")
+    status = models.IntegerField(_("Status"), choices=Status, default=Status.RUNNING)
+    file_name = models.CharField(_("File name"), max_length=256)
+    rows_total = models.PositiveBigIntegerField(_("Rows total"), default=0)
+    rows_imported = models.PositiveBigIntegerField(_("Rows imported"), default=0)
+    rows_failed = models.PositiveBigIntegerField(_("Rows failed"), default=0)
+    error_report = models.FileField(_("Error report"), upload_to="imports/", blank=True)
+    chunk_size = models.PositiveIntegerField(_("Chunk size"), default=0)
+    # imported objects have greater ids, they are indexed for search after import
+    start_object_id = models.PositiveBigIntegerField(_("Start object id"), default=0)
+    error = models.TextField(_("Error"), blank=True, default="")
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+
+    def __repr__(self) -> str:
+        """Return a string representation of TableImport"""
+        return f"TableImport(table={self.table_id}, file_name={self.file_name}, status={self.status})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    def get_absolute_url(self) -> str:
+        """Return url to import page"""
+        return reverse("import-detail", kwargs={"table_id": self.table_id, "import_id": self.pk})
+
+
+class TableImportChunk(models.Model):
+    """
+    Committed chunk of bulk load. Chunk is saved in the same
+    transaction as its objects, so interrupted load is resumed
+    after chunks that exist
+    """
+
+    class Meta:
+        """Model settings"""
+
+        unique_together = ("table_import", "index")
+
+    table_import = models.ForeignKey(TableImport, on_delete=models.CASCADE, related_name="chunks")
+    index = models.PositiveIntegerField(_("Index"))
+    first_line = models.PositiveBigIntegerField(_("First line"))
+    rows_total = models.PositiveIntegerField(_("Rows total"), default=0)
+    rows_imported = models.PositiveIntegerField(_("Rows imported"), default=0)
+    rows_failed = models.PositiveIntegerField(_("Rows failed"), default=0)
+    errors = models.JSONField(_("Errors"), default=list)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+
+    def __repr__(self) -> str:
+        """Return a string representation of TableImportChunk"""
+        return f"TableImportChunk(table_import={self.table_import_id}, index={self.index})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+
+class SearchNgram(models.Model):
+    """
+    Entry of n-gram search index: n-gram of value of text column
+    of object. Maintained by table.utils.search.NgramSearchBackend
+    """
+
+    class Meta:
+        """Model settings"""
+
+        indexes = [
+            models.Index(fields=["table", "column", "ngram", "object_id"]),
+            models.Index(fields=["table", "object_id"]),
+        ]
+
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="+")
+    column = models.CharField(_("Column"), max_length=64)
+    object_id = models.BigIntegerField(_("Object id"))
+    ngram = models.CharField(_("N-gram"), max_length=8)
+
+    def __repr__(self) -> str:
+        """Return a string representation of SearchNgram"""
+        return f"SearchNgram(table={self.table_id}, object_id={self.object_id}, ngram={self.ngram})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+
+class SearchIndexState(models.Model):
+    """
+    Column of table whose n-gram index is complete. Columns without
+    state are searched without index until their index is built
+    """
+
+    class Meta:
+        """Model settings"""
+
+        unique_together = ("table", "column")
+
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="+")
+    column = models.CharField(_("Column"), max_length=64)
+    built_at = models.DateTimeField(_("Built at"), auto_now=True)
+
+    def __repr__(self) -> str:
+        """Return a string representation of SearchIndexState"""
+        return f"SearchIndexState(table={self.table_id}, column={self.column})"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+
+class GlobalSearchTerm(models.Model):
+    """
+    Entry of global search index: word of value of text column
+    of object. Maintained by table.utils.global_search
+    """
+
+    class Meta:
+        """Model settings"""
+
+        indexes = [
+            models.Index(fields=["term", "column"]),
+            models.Index(fields=["table", "object_id"]),
+        ]
+
+    term = models.CharField(_("Term"), max_length=64)
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="+")
+    column = models.CharField(_("Column"), max_length=64)
+    object_id = models.BigIntegerField(_("Object id"))
+
+    def __repr__(self) -> str:
+        """Return a string representation of GlobalSearchTerm"""
+        return f"GlobalSearchTerm(term={self.term}, table={self.table_id}, object_id={self.object_id})"
+
+    def __str__(self) -> str:
+        return repr(self)
@@ -0,0 +1,19 @@
+"""
+Signals of table app. Drop search index entries of removed columns,
+entries of deleted tables are deleted with them by cascade
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from table.models import Column, Table
+from table.utils import global_search
+from table.utils.search import get_search_backend
+
+
+@receiver(post_delete, sender=Column)
+def column_deleted(instance, **kwargs):
+    """Column was removed from table or table was deleted"""
+    if not Table.objects.filter(pk=instance.table_id).exists():
+        return
+    get_search_backend().remove_columns(instance.table, [instance.slug])
+    global_search.remove_columns(instance.table, [instance.slug])
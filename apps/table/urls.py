@@ -9,12 +9,19 @@ from .views import (DasboardView,
                     TableObjectEditView,
                     TableObjectDeleteView,
                     RelatedTableObjectsListView,
-                    ExportTableDataView, TableDeleteView)
+                    ExportTableDataView, TableDeleteView,
+                    ExportJobView,
+                    ExportJobDownloadView,
+                    TableImportView,
+                    TableImportDetailView,
+                    TableImportReportView,
+                    GlobalSearchView)
 
 
 urlpatterns = [
     path('', DasboardView.as_view()),
     path('table/', TableListView.as_view(), name="table-list"),
+    path('search/', GlobalSearchView.as_view(), name="global-search"),
 
     path('table/add/', TableCreateView.as_view(), name='table-add'),
     path('table/<int:table_id>/edit/', TableUpdateView.as_view(), name='table-edit'),
@@ -28,6 +35,13 @@ urlpatterns = [
                                                        name="object-edit"),
     path('table/<int:table_id>/<int:object_id>/delete/', TableObjectDeleteView.as_view(), 
                                                          name="object-delete"),
-    path('table/<int:table_id>/export/', ExportTableDataView.as_view(), name='table-export')
+    path('table/<int:table_id>/export/', ExportTableDataView.as_view(), name='table-export'),
+    path('table/<int:table_id>/export/<int:export_id>/', ExportJobView.as_view(), name='export-detail'),
+    path('table/<int:table_id>/export/<int:export_id>/download/', ExportJobDownloadView.as_view(),
+         name='export-download'),
+    path('table/<int:table_id>/import/', TableImportView.as_view(), name='table-import'),
+    path('table/<int:table_id>/import/<int:import_id>/', TableImportDetailView.as_view(), name='import-detail'),
+    path('table/<int:table_id>/import/<int:import_id>/report/', TableImportReportView.as_view(),
+         name='import-report'),
 
 ]
@@ -0,0 +1,215 @@
+"""
+Parallel bulk load of big files to dynamic tables.
+File is split to chunks of rows which are validated and inserted
+by process pool, each worker uses one db connection. Chunk is
+committed together with its checkpoint, so interrupted load
+is resumed after committed chunks
+"""
+from __future__ import annotations
+
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import IO, Iterator
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from logs.models import Logs
+from logs.utils import log
+from table.models import Table, TableDataVersion, TableImport, TableImportChunk
+from table.utils.importer import ImportFileError, TableImporter, get_reader
+from table.utils.row_count import recount_rows
+from table.utils import global_search
+from table.utils.search import get_search_backend
+
+CHUNK_SIZE = getattr(settings, "TABLE_BULK_LOAD_CHUNK_SIZE", 10_000)
+WORKERS = getattr(settings, "TABLE_BULK_LOAD_WORKERS", os.cpu_count() or 1)
+
+
+class ChunkImporter(TableImporter):
+    """
+    Importer of one chunk. Numbers of rows and errors are stored
+    in chunk, row count of table is recounted once load is finished
+    """
+
+    def __init__(self, table: Table, chunk: TableImportChunk) -> None:
+        """Initialize importer"""
+        super().__init__(table)
+        self.table_import = chunk
+
+    def on_inserted(self, count: int) -> None:
+        """Count inserted objects"""
+        self.table_import.rows_imported += count
+
+    def report(self, line: int, row: list, message: str) -> None:
+        """Store failed row in chunk"""
+        row = [value if isinstance(value, (str, int, float, type(None))) else str(value)
+               for value in row]
+        self.table_import.errors.append([line, row, message])
+        self.table_import.rows_failed += 1
+
+
+def load_chunk(table_id: int, import_id: int, index: int,
+               header: list, rows: list[tuple[int, list]]) -> int:
+    """Validate and insert rows of chunk in worker process, return index of chunk"""
+    table = Table.objects.get(pk=table_id)
+    chunk = TableImportChunk(table_import_id=import_id, index=index, first_line=rows[0][0])
+    importer = ChunkImporter(table, chunk)
+    importer.map_header(header)
+    with transaction.atomic():
+        importer.import_batch(rows)
+        chunk.save()
+    return index
+
+
+class BulkLoader:
+    """Loader of file to table by process pool"""
+
+    def __init__(self, table: Table, user=None, workers: int = WORKERS,
+                 chunk_size: int = CHUNK_SIZE) -> None:
+        """Initialize loader"""
+        self.table = table
+        self.user = user
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.table_import = None
+        self.header = []
+
+    def run(self, file: IO[bytes], file_name: str,
+            table_import: TableImport | None = None) -> TableImport:
+        """
+        Load file to table. If interrupted import is given,
+        its committed chunks are skipped
+        """
+        if self.table.get_active_schema_change():
+            raise ImportFileError("Table schema is being changed, try again later")
+
+        if table_import is None:
+            table_import = TableImport.objects.create(
+                table=self.table, user=self.user, file_name=file_name,
+                chunk_size=self.chunk_size,
+                start_object_id=TableImporter(self.table).get_last_object_id())
+        self.table_import = table_import
+        self.table_import.status = TableImport.Status.RUNNING
+        self.table_import.save(update_fields=["status", "updated_at"])
+
+        try:
+            self.load(file, file_name)
+        except BaseException as error:
+            self.table_import.status = TableImport.Status.FAILED
+            self.table_import.error = str(error) or error.__class__.__name__
+            self.table_import.save(update_fields=["status", "error", "updated_at"])
+            raise
+        finally:
+            self.on_loaded()
+
+        self.table_import.status = TableImport.Status.DONE
+        self.table_import.error = ""
+        self.write_report()
+        self.table_import.save()
+        log(
+            user=self.user,
+            table=self.table,
+            object_id=None,
+            message="Imported objects",
+            action=Logs.Action.IMPORT,
+            description=(f"Bulk loaded {self.table_import.rows_imported} objects "
+                         f"from {file_name}, {self.table_import.rows_failed} rows failed"),
+        )
+        return self.table_import
+
+    def load(self, file: IO[bytes], file_name: str) -> None:
+        """Read file and load it by chunks"""
+        rows = get_reader(file_name)(file)
+        self.header = header = next(rows, None)
+        if not header:
+            raise ImportFileError("File is empty")
+        TableImporter(self.table).map_header(header)
+
+        try:
+            self.load_chunks(rows, header)
+        finally:
+            rows.close()
+
+    def load_chunks(self, rows: Iterator[list], header: list) -> None:
+        """Send chunks that are not committed yet to workers"""
+        chunk_size = self.table_import.chunk_size
+        committed = set(self.table_import.chunks.values_list("index", flat=True))
+
+        # workers must not share connection of this process
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+            pending = set()
+            chunk, index = [], 0
+            for line, row in enumerate(rows, start=2):
+                if all(value is None or str(value).strip() == "" for value in row):
+                    continue
+                chunk.append((line, row))
+                if len(chunk) < chunk_size:
+                    continue
+                if index not in committed:
+                    pending = self.submit(executor, pending, index, header, chunk)
+                chunk, index = [], index + 1
+
+            if chunk and index not in committed:
+                pending = self.submit(executor, pending, index, header, chunk)
+            self.wait(pending, return_when=ALL_COMPLETED)
+
+    def submit(self, executor: ProcessPoolExecutor, pending: set, index: int,
+               header: list, chunk: list) -> set:
+        """
+        Send chunk to worker. Number of chunks in flight is limited,
+        so memory use doesn't depend on size of file
+        """
+        if len(pending) >= self.workers * 2:
+            pending = self.wait(pending, return_when=FIRST_COMPLETED)
+        pending.add(executor.submit(load_chunk, self.table.pk, self.table_import.pk,
+                                    index, header, chunk))
+        return pending
+
+    def wait(self, pending: set, return_when: str) -> set:
+        """Wait for chunks, raise error of failed chunk"""
+        done, pending = wait(pending, return_when=return_when)
+        for future in done:
+            future.result()
+        return pending
+
+    def on_loaded(self) -> None:
+        """
+        Sum numbers of rows of chunks, update row count, data version
+        and search indexes of table
+        """
+        chunks = list(self.table_import.chunks.values_list("rows_total", "rows_imported",
+                                                           "rows_failed"))
+        self.table_import.rows_total = sum(chunk[0] for chunk in chunks)
+        self.table_import.rows_imported = sum(chunk[1] for chunk in chunks)
+        self.table_import.rows_failed = sum(chunk[2] for chunk in chunks)
+        self.table_import.save(update_fields=["rows_total", "rows_imported",
+                                              "rows_failed", "updated_at"])
+
+        recount_rows(self.table)
+        TableDataVersion.bump(self.table)
+        if self.table_import.rows_imported:
+            imported = self.table.get_model().objects.filter(pk__gt=self.table_import.start_object_id)
+            get_search_backend().index_objects(self.table, imported)
+            global_search.index_objects(self.table, imported)
+
+    def write_report(self) -> None:
+        """Write failed rows of all chunks to error report"""
+        chunks = self.table_import.chunks.filter(rows_failed__gt=0).order_by("index")
+        if not chunks.exists():
+            return
+
+        report = self.table_import.error_report
+        report.name = os.path.join(TableImport.error_report.field.upload_to,
+                                   f"{self.table_import.pk}_errors.csv")
+        os.makedirs(os.path.dirname(report.path), exist_ok=True)
+        with open(report.path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Line"] + [str(name or "") for name in self.header] + ["Error"])
+            for errors in chunks.values_list("errors", flat=True).iterator():
+                for line, row, message in errors:
+                    writer.writerow([line] + row + [message])
@@ -7,6 +7,7 @@ import json
 
 from abc import ABC, abstractmethod
 from enum import Enum
+from functools import cached_property
 
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
@@ -16,6 +17,14 @@ from django.utils.translation import gettext_lazy as _
 
 from markupsafe import Markup
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# smaller batches are checked faster without converting them to array
+NUMPY_MIN_BATCH = 256
+
 
 class ColumnHandler(ABC):
     """
@@ -24,6 +33,9 @@ class ColumnHandler(ABC):
     """
 
     form = None
+    # filters that are faster with index on column
+    indexed_filters = ()
+    indexable = True
 
     def __init__(self, name: str, slug: str, settings: dict) -> None:
         """Initialize ColumnHandler"""
@@ -42,8 +54,18 @@ class ColumnHandler(ABC):
         """Return css class to format table col"""
 
     @abstractmethod
+    def validate_batch(self, values: list) -> dict[int, str]:
+        """
+        Validate column values at once.
+        Return messages of failed values by their positions
+        """
+
     def validate_value(self, value) -> bool:
         """Validate value or raise ValidationError"""
+        errors = self.validate_batch([value])
+        if errors:
+            raise forms.ValidationError(errors[0])
+        return True
 
     @abstractmethod
     def format_value(self, value) -> str:
@@ -61,11 +83,22 @@ class ColumnHandler(ABC):
         """
         return self.settings.get("filters", [])
 
+    def is_indexed(self) -> bool:
+        """
+        Return True if column must have db index: it is marked as
+        indexed in settings or has filters that use index
+        """
+        if not self.indexable:
+            return False
+        return bool(self.settings.get("indexed")) or any(
+            filter_name in self.indexed_filters for filter_name in self.get_filters()
+        )
+
     def get_kwargs(self) -> tuple[list, dict]:
         """
         Return default kwargs of django model field
         """
-        return {"null": True, "blank": True}
+        return {"null": True, "blank": True, "db_index": self.is_indexed()}
 
 
 class ColumnSettingsForm(forms.Form):
@@ -100,10 +133,11 @@ class IntegerSettingsForm(ColumnSettingsForm):
         LTE = "lte", _("Less or equal")
 
     class Meta:
-        field_order = ["filters", "min_value", "max_value"]
+        field_order = ["filters", "min_value", "max_value", "indexed"]
 
     min_value = forms.IntegerField(label=_("Min value"), initial=DEFAULT_MIN_VALUE)
     max_value = forms.IntegerField(label=_("Max value"), initial=DEFAULT_MAX_VALUE)
+    indexed = forms.BooleanField(label=_("Indexed"), required=False)
 
 
 class FloatSettingsForm(ColumnSettingsForm):
@@ -123,10 +157,11 @@ class FloatSettingsForm(ColumnSettingsForm):
     class Meta:
         """Meta class"""
 
-        field_order = ["filters", "min_value", "max_value"]
+        field_order = ["filters", "min_value", "max_value", "indexed"]
 
     min_value = forms.FloatField(label=_("Min value"), initial=DEFAULT_MIN_VALUE)
     max_value = forms.FloatField(label=_("Max value"), initial=DEFAULT_MAX_VALUE)
+    indexed = forms.BooleanField(label=_("Indexed"), required=False)
 
 
 class TextSettingForm(ColumnSettingsForm):
@@ -143,11 +178,12 @@ class TextSettingForm(ColumnSettingsForm):
     template_name = "settings_form/text_column_form.html"
 
     max_length = forms.IntegerField(label=_("Max length"), initial=DEFAULT_MAX_LENGTH)
+    indexed = forms.BooleanField(label=_("Indexed"), required=False)
 
     class Meta:
         """Meta class"""
 
-        field_order = ["filters", "max_length"]
+        field_order = ["filters", "max_length", "indexed"]
 
 
 class BigTextSettingForm(ColumnSettingsForm):
@@ -194,10 +230,54 @@ class RelationColumnSettingForm(ColumnSettingsForm):
         ]
 
 
-class IntegerColumnHandler(ColumnHandler):
+class RangeColumnHandler(ColumnHandler):
+    """
+    Base handler for numeric columns, values must be between
+    min_value and max_value of settings. Empty value is checked as 0
+    """
+
+    numpy_dtype = None
+    # values of other types are checked by Python, so NumPy doesn't convert them
+    numpy_types = ()
+    indexed_filters = ("gte", "lte", "exact")
+
+    @cached_property
+    def bounds(self) -> tuple:
+        """Return min and max value from settings"""
+        min_value = self.settings.get("min_value") or self.settings_form.DEFAULT_MIN_VALUE
+        max_value = self.settings.get("max_value") or self.settings_form.DEFAULT_MAX_VALUE
+        return min_value, max_value
+
+    def validate_batch(self, values: list) -> dict[int, str]:
+        """Validate that values are in bounds"""
+        min_value, max_value = self.bounds
+        values = [0 if value is None else value for value in values]
+        failed = self._find_out_of_range(values, min_value, max_value)
+        if not failed:
+            return {}
+        message = f"Value must be between {min_value} and {max_value}"
+        return dict.fromkeys(failed, message)
+
+    def _find_out_of_range(self, values: list, min_value, max_value) -> list[int]:
+        """Return positions of values out of bounds, NumPy is used for big batches"""
+        if (numpy is not None and len(values) >= NUMPY_MIN_BATCH
+                and all(type(value) in self.numpy_types for value in values)):
+            try:
+                array = numpy.asarray(values, dtype=self.numpy_dtype)
+            except (OverflowError, TypeError, ValueError):
+                pass
+            else:
+                return numpy.flatnonzero(~((array >= min_value) & (array <= max_value))).tolist()
+        return [position for position, value in enumerate(values)
+                if not min_value <= value <= max_value]
+
+
+class IntegerColumnHandler(RangeColumnHandler):
     """Handler for IntegerColumn"""
 
     settings_form = IntegerSettingsForm
+    numpy_dtype = "int64"
+    numpy_types = (int,)
 
     def get_model_field(self) -> Field:
         kwargs = self.get_kwargs()
@@ -206,29 +286,17 @@ class IntegerColumnHandler(ColumnHandler):
     def get_css_formating_class(self) -> Field:
         return "integer"
 
-    def validate_value(self, value) -> bool:
-        min_value = (
-                self.settings.get("min_value") or IntegerSettingsForm.DEFAULT_MIN_VALUE
-        )
-        max_value = (
-                self.settings.get("max_value") or IntegerSettingsForm.DEFAULT_MAX_VALUE
-        )
-        value = 0 if value is None else value
-        if not min_value <= value <= max_value:
-            raise forms.ValidationError(
-                f"Value must be between {min_value} and {max_value}"
-            )
-        return True
-
     def format_value(self, value: int) -> int:
         """Formats value"""
         return value
 
 
-class FloatColumnHandler(ColumnHandler):
+class FloatColumnHandler(RangeColumnHandler):
     """Handler for FloatColumn"""
 
     settings_form = FloatSettingsForm
+    numpy_dtype = "float64"
+    numpy_types = (float,)
 
     def get_model_field(self) -> Field:
         kwargs = self.get_kwargs()
@@ -237,20 +305,6 @@ class FloatColumnHandler(ColumnHandler):
     def get_css_formating_class(self) -> Field:
         return "float"
 
-    def validate_value(self, value) -> bool:
-        min_value = (
-                self.settings.get("min_value") or FloatSettingsForm.DEFAULT_MIN_VALUE
-        )
-        max_value = (
-                self.settings.get("max_value") or FloatSettingsForm.DEFAULT_MAX_VALUE
-        )
-        value = 0 if value is None else value
-        if not min_value <= value <= max_value:
-            raise forms.ValidationError(
-                f"Value must be between {min_value} and {max_value}"
-            )
-        return True
-
     def format_value(self, value: float) -> float:
         """Formats value"""
         return value
@@ -260,6 +314,7 @@ class TextColumnHandler(ColumnHandler):
     """Handler for IntegerColumn"""
 
     settings_form = TextSettingForm
+    indexed_filters = ("exact",)
 
     def get_model_field(self) -> Field:
         kwargs = self.get_kwargs()
@@ -268,17 +323,20 @@ class TextColumnHandler(ColumnHandler):
     def get_css_formating_class(self) -> Field:
         return "text"
 
-    def validate_value(self, value: str) -> bool:
-        """Validate text field"""
-        max_length = (
-                self.settings.get("max_length") or TextSettingForm.DEFAULT_MAX_LENGTH
-        )
-        value = "" if value is None else value
-        if len(value) > max_length:
-            raise forms.ValidationError(
-                f"Length must be less than or equal to {max_length}"
-            )
-        return True
+    @cached_property
+    def max_length(self) -> int:
+        """Return max length from settings"""
+        return self.settings.get("max_length") or TextSettingForm.DEFAULT_MAX_LENGTH
+
+    def validate_batch(self, values: list) -> dict[int, str]:
+        """Validate text values"""
+        max_length = self.max_length
+        message = f"Length must be less than or equal to {max_length}"
+        return {
+            position: message
+            for position, value in enumerate(values)
+            if value is not None and len(value) > max_length
+        }
 
     def format_value(self, value: str) -> str:
         """Formats value"""
@@ -289,6 +347,8 @@ class BigTextColumnHandler(ColumnHandler):
     """Handler for IntegerColumn"""
 
     settings_form = BigTextSettingForm
+    # text of unlimited length can't be indexed as a whole
+    indexable = False
 
     def get_model_field(self) -> Field:
         kwargs = self.get_kwargs()
@@ -297,9 +357,9 @@ class BigTextColumnHandler(ColumnHandler):
     def get_css_formating_class(self) -> Field:
         return "Big text"
 
-    def validate_value(self, value: str) -> bool:
-        """Validate text field"""
-        return True
+    def validate_batch(self, values: list) -> dict[int, str]:
+        """Any text is valid"""
+        return {}
 
     def format_value(self, value: str) -> str:
         """Formats value"""
@@ -310,12 +370,15 @@ class RelationColumnHandler(ColumnHandler):
     """Column handler for relation"""
 
     settings_form = RelationColumnSettingForm
+    # foreign keys are always indexed
+    indexable = False
 
     def get_css_formating_class(self) -> Field:
         return "text"
 
-    def validate_value(self, value) -> bool:
-        pass
+    def validate_batch(self, values: list) -> dict[int, str]:
+        """Existence of related objects is checked by db"""
+        return {}
 
     def get_model_field(self) -> Field:
         from table.models import Table
@@ -4,20 +4,66 @@ from typing import Any
 
 from ajax_select import LookupChannel
 from ajax_select.fields import AutoCompleteSelectWidget
-from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.db.models import ManyToOneRel, Model
 from django.urls import reverse
 from django import forms
 
+from table.utils.lookup_cache import LookupItem, lookup_cache
+
 
 class DynamicModelMixin:
     """Mixin class for dynamic models"""
 
     table = None
+    schema_change_id = None
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
+    def save(self, *args, **kwargs) -> None:
+        """
+        Save object, update row count and data version of table and
+        record object for schema change of table. Search indexes
+        are updated in background after transaction is committed
+        """
+        from table.models import TableDataVersion
+        from table.utils.index_writer import index_writer
+        from table.utils.row_count import adjust_row_count
+
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                adjust_row_count(self.table, 1)
+            TableDataVersion.bump(self.table)
+            if self.schema_change_id:
+                from table.utils.online_schema import record_change
+                record_change(self.__class__, self.pk)
+        table, object_id = self.table, self.pk
+        transaction.on_commit(lambda: index_writer.add(table, object_id))
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete object, update row count and data version of table and
+        record deletion for schema change of table. Search indexes
+        are updated in background after transaction is committed
+        """
+        from table.models import TableDataVersion
+        from table.utils.index_writer import index_writer
+        from table.utils.row_count import adjust_row_count
+
+        table, object_id = self.table, self.pk
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            adjust_row_count(table, -1)
+            TableDataVersion.bump(table)
+            if self.schema_change_id:
+                from table.utils.online_schema import record_change
+                record_change(self.__class__, object_id)
+        transaction.on_commit(lambda: index_writer.add(table, object_id))
+        return result
+
     def __str__(self) -> str:
         try:
             value = self.get_value_of(self.table.searchable_column)
@@ -64,13 +110,9 @@ class DynamicModelFormMixin:
 
     def _create_autocomplete_fields(self):
         """Add autocomplete fields for ForeignKey columns"""
-        for column in self.columns:
-            if column.dtype != 5:
-                continue
-
-            content_type = ContentType.objects.get(id=column.settings.get("content_type_id"))
-            self.fields[column.slug].widget = AutoCompleteSelectWidget(content_type.model,
-                                                                       attrs={'class': 'input-field'})
+        for slug, channel in self.autocomplete_channels.items():
+            self.fields[slug].widget = AutoCompleteSelectWidget(channel,
+                                                                attrs={'class': 'input-field'})
 
     def clean(self):
         """Validate form data"""
@@ -100,16 +142,84 @@ class DynamicModelFilterSetMixin:
             else:
                 visible.field.widget.attrs['class'] = 'input-field'
 
+    def relation_filter(self, queryset, name, value):
+        """Filter objects related to chosen object by column"""
+        return queryset.filter(**{f"{name}_id": value.pk})
+
+    def search_filter(self, queryset, name, value):
+        """Filter objects which column contains value by search backend"""
+        from table.utils.search import get_search_backend
+
+        if not value:
+            return queryset
+        return get_search_backend().filter(queryset, name, value)
+
 
 class DynamicModelLookup(LookupChannel):
     """Lookup for dynamic model"""
 
     model = None
     searchable_column = None
+    limit = 50
 
     def get_query(self, q, request):
-        filtering_args = {f"{self.searchable_column.slug}__icontains": q}
-        return self.model.objects.filter(**filtering_args).order_by(self.searchable_column.slug)[:50]
+        """
+        Return best matches of query by search backend. Results are cached
+        until data of table changes, query that extends cached query
+        with less than limit matches is answered from them
+        """
+        from table.models import TableDataVersion
+
+        query = q.strip().lower()
+        key = (self.model.table.pk, self.searchable_column.slug)
+        version = TableDataVersion.current(self.model.table)
+        items = lookup_cache.get(key + (query,), version)
+        if items is not None:
+            return items
+
+        items = self.get_prefix_matches(key, query, version)
+        if items is None:
+            items = self.search(query)
+        lookup_cache.set(key + (query,), version, items)
+        return items
+
+    def search(self, query: str) -> list:
+        """Return best matches of query from db"""
+        from table.utils.search import get_search_backend
+
+        slug = self.searchable_column.slug
+        backend = get_search_backend()
+        rows = backend.search(self.model.objects.all(), slug, query).values_list("pk", slug)
+        return [LookupItem(pk, self.format_text(value)) for pk, value in rows[:self.limit]]
+
+    def get_prefix_matches(self, key: tuple, query: str, version: int) -> list | None:
+        """
+        Return matches of query filtered from cached matches of its longest
+        cached prefix. None if prefix is not cached or has limit of matches,
+        then some matches of query may be absent in cache
+        """
+        for length in range(len(query) - 1, 0, -1):
+            items = lookup_cache.get(key + (query[:length],), version)
+            if items is None:
+                continue
+            if len(items) >= self.limit:
+                return None
+            matches = [item for item in items if query in item.text.lower()]
+            return sorted(matches, key=lambda item: self.rank(item, query))
+        return None
+
+    @staticmethod
+    def rank(item, query: str) -> tuple:
+        """Return sort key of item in the same order as search backend ranks results"""
+        text = item.text.lower()
+        position = 0 if text == query else 1 if text.startswith(query) else 2
+        return position, len(item.text), item.text, item.pk
+
+    def format_text(self, value) -> str:
+        """Return text object is displayed by"""
+        if value is None:
+            return ""
+        return str(self.searchable_column.handler.format_value(value))
 
     def format_item_display(self, table_objects):
         """format on display"""
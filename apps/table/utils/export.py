@@ -0,0 +1,306 @@
+"""
+Streaming export of table objects.
+Objects are fetched from db in chunks and written to response
+row by row, so memory use doesn't depend on size of table.
+Exports of big tables are run in background by ExportJob
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import tempfile
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Iterator
+
+import openpyxl
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.http import QueryDict
+from django.utils import timezone
+
+from apps.core.utils import BaseJSONEncoder
+from table.models import Table, Column, ExportJob, TableDataVersion
+
+CHUNK_SIZE = getattr(settings, "TABLE_EXPORT_CHUNK_SIZE", 2000)
+FILE_CHUNK_SIZE = 64 * 1024
+SYNC_LIMIT = getattr(settings, "TABLE_EXPORT_SYNC_LIMIT", 10_000)
+WORKERS = getattr(settings, "TABLE_EXPORT_WORKERS", 2)
+EXPORT_TTL = getattr(settings, "TABLE_EXPORT_TTL", 24 * 60 * 60)
+STALE_AFTER = getattr(settings, "TABLE_EXPORT_STALE_AFTER", 10 * 60)
+
+_executor = None
+
+
+class Echo:
+    """File-like object that returns written value instead of storing it"""
+
+    def write(self, value: str) -> str:
+        """Return value"""
+        return value
+
+
+class TableExporter:
+    """Base exporter of table objects"""
+
+    extension = None
+    content_type = None
+    appendable = False
+
+    def __init__(self, table: Table, queryset: QuerySet, columns: list[Column],
+                 include_header: bool = True,
+                 on_progress: Callable[[TableExporter], None] | None = None) -> None:
+        """Initialize exporter"""
+        self.table = table
+        self.queryset = queryset
+        self.columns = columns
+        self.include_header = include_header
+        self.on_progress = on_progress
+        self.rows_written = 0
+        self.last_id = 0
+
+    def stream(self) -> Iterator[bytes | str]:
+        """Yield parts of exported file"""
+        raise NotImplementedError
+
+    def get_header(self) -> list[str]:
+        """Return names of exported columns"""
+        return ["Id"] + [column.name for column in self.columns]
+
+    def get_rows(self) -> Iterator[list]:
+        """
+        Yield values of objects, objects are fetched in chunks.
+        Progress is reported after each chunk, when all rows
+        before it are written
+        """
+        for object in self.queryset.order_by("pk").iterator(chunk_size=CHUNK_SIZE):
+            yield [object.id] + [self.get_value(object, column) for column in self.columns]
+            self.rows_written += 1
+            self.last_id = object.id
+            if self.on_progress is not None and self.rows_written % CHUNK_SIZE == 0:
+                self.on_progress(self)
+
+    def get_value(self, object, column: Column) -> Any:
+        """Return value of column, related objects are exported by their repr"""
+        value = object.get_repr_of(column)
+        if value is not None and column.dtype == Column.DType.RELATION:
+            return str(value)
+        return value
+
+
+class CSVExporter(TableExporter):
+    """Export objects to CSV"""
+
+    extension = "csv"
+    content_type = "text/csv"
+    appendable = True
+
+    def stream(self) -> Iterator[str]:
+        """Yield CSV lines"""
+        writer = csv.writer(Echo())
+        if self.include_header:
+            yield writer.writerow(self.get_header())
+        for row in self.get_rows():
+            yield writer.writerow(row)
+
+
+class NDJSONExporter(TableExporter):
+    """Export objects to newline delimited JSON, one object per line"""
+
+    extension = "ndjson"
+    content_type = "application/x-ndjson"
+    appendable = True
+
+    def stream(self) -> Iterator[str]:
+        """Yield JSON lines"""
+        header = self.get_header()
+        for row in self.get_rows():
+            yield json.dumps(dict(zip(header, row)), cls=BaseJSONEncoder, ensure_ascii=False) + "\n"
+
+
+class XLSXExporter(TableExporter):
+    """
+    Export objects to XLSX. Rows are written by openpyxl in
+    write-only mode, workbook is assembled in anonymous temporary
+    file which is removed once it is sent
+    """
+
+    extension = "xlsx"
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def stream(self) -> Iterator[bytes]:
+        """Yield chunks of workbook file"""
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        worksheet.append(self.get_header())
+        for row in self.get_rows():
+            worksheet.append(row)
+
+        with tempfile.TemporaryFile() as file:
+            workbook.save(file)
+            file.seek(0)
+            while chunk := file.read(FILE_CHUNK_SIZE):
+                yield chunk
+
+
+EXPORTERS = {
+    exporter.extension: exporter
+    for exporter in (XLSXExporter, CSVExporter, NDJSONExporter)
+}
+
+
+def get_export_queryset(table: Table, query: str) -> QuerySet:
+    """Return objects of table filtered by filter querystring"""
+    model = table.get_model()
+    filterset = table.get_filterset()(QueryDict(query), queryset=model.objects.all())
+    return filterset.qs
+
+
+def queue_export(table: Table, user, format: str, query: str) -> ExportJob:
+    """
+    Return export of table objects. Export made from the same data,
+    schema and filters is reused, otherwise new job is queued
+    """
+    cleanup_exports()
+
+    versions = {
+        "schema_version": table.schema_version,
+        "data_version": TableDataVersion.current(table),
+    }
+    job = (
+        ExportJob.objects.filter(table=table, format=format, query=query, **versions)
+        .exclude(status=ExportJob.Status.FAILED)
+        .order_by("-pk")
+        .first()
+    )
+    if job is not None:
+        return job
+
+    name = f"{table.name}_export_on_{timezone.now().strftime('%Y-%m-%d %H:%M')}.{format}"
+    job = ExportJob.objects.create(table=table, user=user, format=format,
+                                   query=query, name=name, **versions)
+    if WORKERS:
+        transaction.on_commit(lambda: run_in_background(job))
+    return job
+
+
+def run_in_background(job: ExportJob) -> None:
+    """Run export in thread pool of this process"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="export")
+    _executor.submit(ExportRunner(job).run)
+
+
+def get_claimable_exports() -> QuerySet:
+    """
+    Return pending exports and running exports without progress
+    for STALE_AFTER seconds, i.e interrupted ones
+    """
+    stale = timezone.now() - timedelta(seconds=STALE_AFTER)
+    return ExportJob.objects.filter(
+        Q(status=ExportJob.Status.PENDING)
+        | Q(status=ExportJob.Status.RUNNING, updated_at__lt=stale)
+    )
+
+
+def cleanup_exports() -> None:
+    """Delete finished exports older than EXPORT_TTL with their files"""
+    expired = ExportJob.objects.filter(
+        status__in=(ExportJob.Status.DONE, ExportJob.Status.FAILED),
+        updated_at__lt=timezone.now() - timedelta(seconds=EXPORT_TTL),
+    )
+    for job in expired:
+        job.file.delete(save=False)
+        job.delete()
+
+
+class ExportRunner:
+    """
+    Executor of ExportJob. Interrupted CSV and NDJSON exports are
+    resumed after last exported object, other formats are restarted
+    """
+
+    def __init__(self, job: ExportJob) -> None:
+        """Initialize executor"""
+        self.job = job
+        self.file = None
+        self.resumed_rows = 0
+        self.claimed = False
+
+    def claim(self) -> bool:
+        """
+        Mark job as running by this runner. Return False if job
+        is already run by other runner or finished
+        """
+        claimed = get_claimable_exports().filter(pk=self.job.pk).update(
+            status=ExportJob.Status.RUNNING, updated_at=timezone.now()
+        )
+        if claimed:
+            self.job.refresh_from_db()
+        self.claimed = bool(claimed)
+        return self.claimed
+
+    def run(self) -> None:
+        """Write exported objects to file of job if job is claimed by runner"""
+        try:
+            if self.claimed or self.claim():
+                self.export()
+        except Exception as error:
+            traceback.print_exc()
+            self.job.status = ExportJob.Status.FAILED
+            self.job.error = str(error)
+            self.job.save(update_fields=["status", "error", "updated_at"])
+        finally:
+            connection.close()
+
+    def export(self) -> None:
+        """Export objects, continue interrupted export if possible"""
+        job = self.job
+        table = job.table
+        exporter_class = EXPORTERS[job.format]
+        columns = table.get_columns()
+        queryset = get_export_queryset(table, job.query)
+
+        if not job.file:
+            job.file.name = os.path.join(ExportJob.file.field.upload_to, f"{job.pk}.{job.format}")
+        path = job.file.path
+        resume = (exporter_class.appendable and job.last_exported_id
+                  and os.path.exists(path))
+        if not resume:
+            job.rows_written = job.last_exported_id = job.file_size = 0
+            job.rows_total = queryset.count()
+        self.resumed_rows = job.rows_written
+        job.status = ExportJob.Status.RUNNING
+        job.started_at = job.started_at if resume else timezone.now()
+        job.save()
+
+        exporter = exporter_class(
+            table,
+            table.optimize_queryset(queryset.filter(pk__gt=job.last_exported_id), columns),
+            columns,
+            include_header=not resume,
+            on_progress=self.save_progress,
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "r+b" if resume else "wb") as self.file:
+            # drop rows written after last saved progress
+            self.file.truncate(job.file_size)
+            self.file.seek(job.file_size)
+            for chunk in exporter.stream():
+                self.file.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            self.save_progress(exporter)
+
+        job.status = ExportJob.Status.DONE
+        job.save(update_fields=["status", "updated_at"])
+
+    def save_progress(self, exporter: TableExporter) -> None:
+        """Save number of written rows and size of file written so far"""
+        self.file.flush()
+        self.job.rows_written = self.resumed_rows + exporter.rows_written
+        self.job.last_exported_id = exporter.last_id or self.job.last_exported_id
+        self.job.file_size = self.file.tell()
+        self.job.save(update_fields=["rows_written", "last_exported_id", "file_size", "updated_at"])
@@ -0,0 +1,169 @@
+"""
+Search of objects across all tables.
+Words of text and big text columns of every table are kept in one
+inverted index GlobalSearchTerm, query words are matched to indexed
+words by prefix, so search doesn't touch tables themselves
+"""
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, QuerySet, Q, Value, When
+
+from table.models import Table, Column, GlobalSearchTerm
+from table.utils.model_registry import model_registry
+from user.models import TablePermission
+
+TEXT_DTYPES = (Column.DType.TEXT, Column.DType.BIG_TEXT)
+# shorter words match too many terms by prefix
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = GlobalSearchTerm.term.field.max_length
+RESULTS_LIMIT = 50
+CHUNK_SIZE = 1000
+WORD_RE = re.compile(r"\w+")
+
+
+class SearchResult(NamedTuple):
+    """Found object with its table and values of text columns user can read"""
+
+    table: Table
+    object: object
+    values: list[tuple[Column, str]]
+
+
+def get_terms(value: str | None) -> list[str]:
+    """Return unique lowercased words of value in order of appearance"""
+    if not value:
+        return []
+    words = (word[:MAX_TERM_LENGTH] for word in WORD_RE.findall(value.lower()))
+    return list(dict.fromkeys(word for word in words if len(word) >= MIN_TERM_LENGTH))
+
+
+def get_text_columns(table: Table) -> list[Column]:
+    """Return indexed columns of table"""
+    return model_registry.get_artifact(
+        table, "global_search_columns",
+        lambda: [column for column in table.get_columns() if column.dtype in TEXT_DTYPES],
+    )
+
+
+def index_object(object) -> None:
+    """Replace terms of saved object"""
+    columns = get_text_columns(object.table)
+    if columns:
+        write(object.table, columns, [
+            [object.pk] + [getattr(object, column.slug) for column in columns]
+        ])
+
+
+def remove_object(table: Table, object_id: int) -> None:
+    """Delete terms of deleted object"""
+    GlobalSearchTerm.objects.filter(table_id=table.pk, object_id=object_id).delete()
+
+
+def remove_columns(table: Table, slugs: list[str]) -> None:
+    """Delete terms of removed columns"""
+    GlobalSearchTerm.objects.filter(table_id=table.pk, column__in=slugs).delete()
+
+
+def index_objects(table: Table, queryset: QuerySet) -> int:
+    """Replace terms of objects, objects are read in chunks. Return number of objects"""
+    columns = get_text_columns(table)
+    if not columns:
+        return 0
+
+    rows, count = [], 0
+    values = queryset.order_by("pk").values_list("pk", *[column.slug for column in columns])
+    for row in values.iterator(chunk_size=CHUNK_SIZE):
+        rows.append(row)
+        if len(rows) >= CHUNK_SIZE:
+            count += write(table, columns, rows)
+            rows = []
+    if rows:
+        count += write(table, columns, rows)
+    return count
+
+
+def rebuild(table: Table) -> int:
+    """Drop terms of table and index all its objects"""
+    GlobalSearchTerm.objects.filter(table_id=table.pk).delete()
+    return index_objects(table, table.get_model().objects.all())
+
+
+def write(table: Table, columns: list[Column], rows: list) -> int:
+    """Replace terms of rows, row is id followed by values of columns"""
+    entries = [
+        GlobalSearchTerm(term=term, table_id=table.pk, column=column.slug, object_id=row[0])
+        for row in rows
+        for column, value in zip(columns, row[1:])
+        for term in get_terms(value)
+    ]
+    with transaction.atomic():
+        GlobalSearchTerm.objects.filter(table_id=table.pk,
+                                        object_id__in=[row[0] for row in rows]).delete()
+        GlobalSearchTerm.objects.bulk_create(entries, batch_size=CHUNK_SIZE)
+    return len(rows)
+
+
+def get_readable_columns(user) -> dict[str, Column]:
+    """Return indexed columns that user can read by their slugs, tables of columns are set"""
+    tables = {
+        table.pk: table for table in Table.objects.all()
+        if user.has_permission(TablePermission.Operation.READ, table)
+    }
+    columns = Column.objects.filter(table__in=tables.values(), dtype__in=TEXT_DTYPES)
+    readable = {}
+    for column in columns:
+        column.table = tables[column.table_id]
+        if user.has_permission(TablePermission.Operation.READ, column):
+            readable[column.slug] = column
+    return readable
+
+
+def search(user, query: str, limit: int = RESULTS_LIMIT) -> list[SearchResult]:
+    """
+    Return objects that have any word of query in columns user can read.
+    Objects that match more words of query are first
+    """
+    terms = get_terms(query)
+    columns = get_readable_columns(user) if terms else {}
+    if not columns:
+        return []
+
+    matches = Q()
+    score = Value(0)
+    for term in terms:
+        matches |= Q(term__startswith=term)
+        # object scores once per word of query that it matches
+        score += Max(Case(When(term__startswith=term, then=Value(1)),
+                          default=Value(0), output_field=IntegerField()))
+    hits = list(
+        GlobalSearchTerm.objects.filter(matches, column__in=columns)
+        .values("table_id", "object_id")
+        .annotate(score=score)
+        .order_by("-score", "table_id", "object_id")[:limit]
+    )
+
+    tables, table_columns = {}, {}
+    for column in columns.values():
+        tables[column.table_id] = column.table
+        table_columns.setdefault(column.table_id, []).append(column)
+    ids = {}
+    for hit in hits:
+        ids.setdefault(hit["table_id"], []).append(hit["object_id"])
+    objects = {
+        table_id: tables[table_id].get_model().objects.in_bulk(object_ids)
+        for table_id, object_ids in ids.items()
+    }
+
+    # objects deleted bypassing index are skipped
+    results = []
+    for hit in hits:
+        object = objects[hit["table_id"]].get(hit["object_id"])
+        if object is None:
+            continue
+        values = [(column, getattr(object, column.slug)) for column in table_columns[hit["table_id"]]]
+        results.append(SearchResult(tables[hit["table_id"]], object, values))
+    return results
@@ -0,0 +1,305 @@
+"""
+Import of table objects from CSV and XLSX files.
+File is parsed row by row, rows are validated and inserted
+in batches, rows that failed are written to error report
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import traceback
+from typing import IO, Iterator
+
+import openpyxl
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+
+from logs.models import Logs
+from logs.utils import log
+from table.models import Table, Column, TableDataVersion, TableImport
+from table.utils.row_count import adjust_row_count
+from table.utils import global_search
+from table.utils.search import get_search_backend
+
+BATCH_SIZE = getattr(settings, "TABLE_IMPORT_BATCH_SIZE", 1000)
+ID_HEADER = "id"
+
+
+class ImportFileError(Exception):
+    """File can't be imported"""
+
+
+def read_csv(file: IO[bytes]) -> Iterator[list]:
+    """Yield rows of CSV file"""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        text.detach()
+
+
+def read_xlsx(file: IO[bytes]) -> Iterator[list]:
+    """Yield rows of first worksheet of XLSX file, worksheet is read lazily"""
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+READERS = {
+    "csv": read_csv,
+    "xlsx": read_xlsx,
+}
+
+
+def get_reader(file_name: str):
+    """Return reader of file by its extension"""
+    extension = os.path.splitext(file_name)[1].lstrip(".").lower()
+    if extension not in READERS:
+        raise ImportFileError(f"Unsupported file type, use one of: {', '.join(READERS)}")
+    return READERS[extension]
+
+
+class TableImporter:
+    """
+    Importer of objects from file to table. File columns are matched
+    to table columns by name or slug, column "Id" is ignored
+    """
+
+    def __init__(self, table: Table, user=None, batch_size: int = BATCH_SIZE) -> None:
+        """Initialize importer"""
+        self.table = table
+        self.user = user
+        self.batch_size = batch_size
+        self.model = table.get_model()
+        self.columns = table.get_columns()
+        self.header = []
+        self.mapping = []
+        self.table_import = None
+        self.report_file = None
+        self.report_writer = None
+
+    def run(self, file: IO[bytes], file_name: str) -> TableImport:
+        """Import objects from file, return summary of import"""
+        self.table_import = TableImport.objects.create(table=self.table, user=self.user,
+                                                       file_name=file_name,
+                                                       start_object_id=self.get_last_object_id())
+        try:
+            self.import_file(file, file_name)
+            self.table_import.status = TableImport.Status.DONE
+        except Exception as error:
+            if not isinstance(error, ImportFileError):
+                traceback.print_exc()
+            self.table_import.status = TableImport.Status.FAILED
+            self.table_import.error = str(error)
+        finally:
+            if self.report_file is not None:
+                self.report_file.close()
+            self.table_import.save()
+
+        if self.table_import.rows_imported:
+            self.index_imported()
+            log(
+                user=self.user,
+                table=self.table,
+                object_id=None,
+                message="Imported objects",
+                action=Logs.Action.IMPORT,
+                description=(f"Imported {self.table_import.rows_imported} objects "
+                             f"from {file_name}, {self.table_import.rows_failed} rows failed"),
+            )
+        return self.table_import
+
+    def import_file(self, file: IO[bytes], file_name: str) -> None:
+        """Read file and import its rows in batches"""
+        if self.table.get_active_schema_change():
+            raise ImportFileError("Table schema is being changed, try again later")
+
+        rows = get_reader(file_name)(file)
+        self.header = next(rows, None)
+        if not self.header:
+            raise ImportFileError("File is empty")
+        self.map_header(self.header)
+
+        batch = []
+        for line, row in enumerate(rows, start=2):
+            if all(value is None or str(value).strip() == "" for value in row):
+                continue
+            batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                self.save_progress()
+                batch = []
+        if batch:
+            self.import_batch(batch)
+            self.save_progress()
+
+    def map_header(self, header: list) -> None:
+        """Find column of each header cell"""
+        columns = {}
+        for column in self.columns:
+            columns[column.name.strip().lower()] = column
+            columns[column.slug] = column
+
+        unknown = []
+        for position, name in enumerate(header):
+            key = str(name or "").strip().lower()
+            if key == ID_HEADER:
+                continue
+            if key not in columns:
+                unknown.append(str(name))
+                continue
+            self.mapping.append((position, columns[key]))
+
+        if unknown:
+            raise ImportFileError(f"Unknown columns: {', '.join(unknown)}")
+        if not self.mapping:
+            raise ImportFileError("File has no columns of table")
+        mapped = [column.slug for _, column in self.mapping]
+        if len(mapped) != len(set(mapped)):
+            raise ImportFileError("Column is present in file more than once")
+
+    def import_batch(self, batch: list[tuple[int, list]]) -> None:
+        """
+        Validate rows of batch and insert valid ones. Import is stopped if
+        schema change of table was started, rows inserted by import
+        are not recorded for it
+        """
+        if self.table.get_active_schema_change():
+            raise ImportFileError("Table schema is being changed, try again later")
+        objects = []
+        for line, row, values, errors in self.clean_batch(batch):
+            if errors:
+                self.report(line, row, "; ".join(errors))
+            else:
+                objects.append((line, row, self.model(**values)))
+
+        self.table_import.rows_total += len(batch)
+        self.insert(objects)
+
+    def save_progress(self) -> None:
+        """Save numbers of processed rows"""
+        self.table_import.save(update_fields=["rows_total", "rows_imported",
+                                              "rows_failed", "updated_at"])
+
+    def clean_batch(self, batch: list[tuple[int, list]]) -> list[tuple[int, list, dict, list]]:
+        """
+        Convert and validate values of rows. Values are validated
+        by column handlers column by column.
+        Return rows with model field values and validation errors
+        """
+        cleaned = []
+        for line, row in batch:
+            values, errors = {}, []
+            for position, column in self.mapping:
+                raw_value = row[position] if position < len(row) else None
+                try:
+                    values[self.get_attname(column)] = self.clean_value(column, raw_value)
+                except ValidationError as error:
+                    errors.append(f"{column.name}: {' '.join(error.messages)}")
+            cleaned.append((line, row, values, errors))
+
+        for _, column in self.mapping:
+            attname = self.get_attname(column)
+            converted = [index for index, (*_, values, errors) in enumerate(cleaned) if attname in values]
+            failed = column.handler.validate_batch([cleaned[index][2][attname] for index in converted])
+            for position, message in failed.items():
+                cleaned[converted[position]][3].append(f"{column.name}: {message}")
+
+        self.check_relations(cleaned)
+        return cleaned
+
+    def clean_value(self, column: Column, value):
+        """Convert value from file to python value of model field"""
+        if isinstance(value, str):
+            value = value.strip()
+        if value == "":
+            value = None
+
+        if column.dtype == Column.DType.RELATION:
+            if value is None:
+                return None
+            try:
+                return int(value)
+            except (TypeError, ValueError) as error:
+                raise ValidationError("Id of related object must be integer") from error
+
+        return self.model._meta.get_field(column.slug).clean(value, None)
+
+    def check_relations(self, cleaned: list[tuple[int, list, dict, list]]) -> None:
+        """Add errors to rows that refer to objects that don't exist"""
+        for _, column in self.mapping:
+            if column.dtype != Column.DType.RELATION:
+                continue
+
+            attname = self.get_attname(column)
+            ids = {values[attname] for *_, values, errors in cleaned
+                   if not errors and values.get(attname) is not None}
+            if not ids:
+                continue
+            related_model = self.model._meta.get_field(column.slug).related_model
+            existing = set(related_model._base_manager.filter(pk__in=ids).values_list("pk", flat=True))
+            for *_, values, errors in cleaned:
+                if not errors and values.get(attname) not in existing | {None}:
+                    errors.append(f"{column.name}: Related object {values[attname]} does not exist")
+
+    def insert(self, objects: list[tuple[int, list, models.Model]]) -> None:
+        """
+        Insert objects in one transaction. If db rejects batch, objects
+        are inserted one by one and rejected ones are reported
+        """
+        if not objects:
+            return
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create([object for *_, object in objects])
+                self.on_inserted(len(objects))
+        except DatabaseError:
+            for line, row, object in objects:
+                try:
+                    with transaction.atomic():
+                        self.model.objects.bulk_create([object])
+                        self.on_inserted(1)
+                except DatabaseError as error:
+                    self.report(line, row, str(error))
+
+    def on_inserted(self, count: int) -> None:
+        """Update row count and data version of table after insert"""
+        adjust_row_count(self.table, count)
+        TableDataVersion.bump(self.table)
+        self.table_import.rows_imported += count
+
+    def get_last_object_id(self) -> int:
+        """Return id of last object of table, objects imported later have greater ids"""
+        return self.model.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+    def index_imported(self) -> None:
+        """Add imported objects to search indexes"""
+        imported = self.model.objects.filter(pk__gt=self.table_import.start_object_id)
+        get_search_backend().index_objects(self.table, imported)
+        global_search.index_objects(self.table, imported)
+
+    def report(self, line: int, row: list, message: str) -> None:
+        """Write failed row to error report"""
+        if self.report_writer is None:
+            report = self.table_import.error_report
+            report.name = os.path.join(TableImport.error_report.field.upload_to,
+                                       f"{self.table_import.pk}_errors.csv")
+            os.makedirs(os.path.dirname(report.path), exist_ok=True)
+            self.report_file = open(report.path, "w", newline="", encoding="utf-8")
+            self.report_writer = csv.writer(self.report_file)
+            self.report_writer.writerow(["Line"] + [str(name or "") for name in self.header] + ["Error"])
+
+        self.report_writer.writerow([line] + list(row) + [message])
+        self.table_import.rows_failed += 1
+
+    @staticmethod
+    def get_attname(column: Column) -> str:
+        """Return name of model attribute that stores value of column"""
+        if column.dtype == Column.DType.RELATION:
+            return f"{column.slug}_id"
+        return column.slug
@@ -0,0 +1,95 @@
+"""
+Buffered updater of search indexes.
+Ids of saved and deleted objects are collected in process and indexed
+from background thread, so requests don't wait for index writes.
+Objects are indexed by their state at time of flush, so several changes
+of one object are indexed once
+"""
+import atexit
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from table.models import Table
+from table.utils import global_search
+from table.utils.search import get_search_backend
+
+BATCH_SIZE = getattr(settings, "TABLE_INDEX_BATCH_SIZE", 100)
+FLUSH_INTERVAL = getattr(settings, "TABLE_INDEX_FLUSH_INTERVAL", 1.0)
+
+
+class IndexWriter:
+    """
+    Buffer of changed objects. Objects are indexed when batch_size of them
+    is collected or flush_interval seconds passed, and on exit of process
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL) -> None:
+        """Initialize empty writer, thread is started on first object"""
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._objects = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        atexit.register(self.close)
+
+    def add(self, table: Table, object_id: int) -> None:
+        """Buffer saved or deleted object, it is indexed by background thread"""
+        with self._lock:
+            self._objects.setdefault(table.pk, (table, set()))[1].add(object_id)
+            full = sum(len(ids) for _, ids in self._objects.values()) >= self.batch_size
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run, name="index-writer", daemon=True)
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def run(self) -> None:
+        """Flush buffer periodically or when it is full"""
+        try:
+            while True:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                close_old_connections()
+                self.flush()
+        finally:
+            connection.close()
+
+    def flush(self) -> int:
+        """Index buffered objects. Return number of indexed objects"""
+        with self._flush_lock:
+            with self._lock:
+                objects, self._objects = self._objects, {}
+            count = 0
+            for table_id, (table, ids) in objects.items():
+                try:
+                    self.write(table, ids)
+                except Exception:
+                    traceback.print_exc()
+                    # objects are kept to be indexed by next flush
+                    with self._lock:
+                        self._objects.setdefault(table_id, (table, set()))[1].update(ids)
+                    continue
+                count += len(ids)
+            return count
+
+    def write(self, table: Table, ids: set[int]) -> None:
+        """Replace index entries of existing objects and remove deleted ones"""
+        queryset = table.get_model().objects.filter(pk__in=ids)
+        backend = get_search_backend()
+        backend.index_objects(table, queryset)
+        global_search.index_objects(table, queryset)
+        for object_id in ids - set(queryset.values_list("pk", flat=True)):
+            backend.remove_object(table, object_id)
+            global_search.remove_object(table, object_id)
+
+    def close(self) -> None:
+        """Index remaining objects, called on exit of process"""
+        self.flush()
+
+
+index_writer = IndexWriter()
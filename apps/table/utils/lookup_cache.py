@@ -0,0 +1,64 @@
+"""
+In-process cache of autocomplete results.
+Autocomplete sends request per keystroke, results of query are kept
+for a short time, so repeated and extended queries don't hit db
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, NamedTuple
+
+from django.conf import settings
+
+CACHE_SIZE = getattr(settings, "TABLE_LOOKUP_CACHE_SIZE", 1000)
+CACHE_TTL = getattr(settings, "TABLE_LOOKUP_CACHE_TTL", 30)
+
+
+class LookupItem(NamedTuple):
+    """Found object of lookup: its id and text it is displayed by"""
+
+    pk: int
+    text: str
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class LookupCache:
+    """
+    LRU cache of lookup results. Entry expires after ttl seconds
+    or when data version of its table changes
+    """
+
+    def __init__(self, size: int = CACHE_SIZE, ttl: float = CACHE_TTL) -> None:
+        """Initialize empty cache"""
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> list[LookupItem] | None:
+        """Return items of key if they are fresh, otherwise None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, expires_at, items = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return items
+
+    def set(self, key: Hashable, version: int, items: list[LookupItem]) -> None:
+        """Store items of key, least recently used entries are dropped"""
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, items)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+lookup_cache = LookupCache()
@@ -0,0 +1,230 @@
+"""
+In-process registry of dynamic models built from tables
+"""
+import threading
+
+from ajax_select import registry as lookup_registry
+from django.apps import apps
+
+
+class LazyModels(dict):
+    """
+    Models of table app in django app registry. Dynamic model that
+    is not built yet is built on first access to its name, so models
+    are not built at startup
+    """
+
+    def __missing__(self, model_name: str):
+        """Build model of table with slug model_name"""
+        from table.models import Table
+
+        # slugs of tables are "table_<hash>", other names are not looked up in db
+        if not model_name.startswith("table_"):
+            raise KeyError(model_name)
+        table = Table.objects.filter(slug=model_name).first()
+        if table is None:
+            raise KeyError(model_name)
+        return table.get_model()
+
+
+class LazyLookupChannels(dict):
+    """
+    Channels of ajax_select registry. Channel of table is named by
+    slug of table, it is built from model registry on first use
+    and removed from here when model of table is dropped
+    """
+
+    def __missing__(self, channel: str):
+        """Build lookup channel of table with slug channel"""
+        from table.models import Table
+
+        if not channel.startswith("table_"):
+            raise KeyError(channel)
+        table = Table.objects.filter(slug=channel).first()
+        if table is None:
+            raise KeyError(channel)
+        lookup_channel = self[channel] = table.get_lookup_channel()
+        return lookup_channel
+
+
+class RegistryEntry:
+    """Classes built for one version of table schema"""
+
+    def __init__(self, version: int, slug: str) -> None:
+        """Initialize entry"""
+        self.version = version
+        self.slug = slug
+        self.model = None
+        self.artifacts = {}
+
+
+class DynamicModelRegistry:
+    """
+    Cache of dynamic model classes. Model of a table is kept
+    until schema version of the table changes, so building of
+    model class is paid only once per schema change. Table instances
+    with older version (i.e kept by stale models) get the newest model.
+
+    Besides model, registry keeps other classes derived from
+    table schema (lookup channels, filtersets, forms), they are
+    dropped together with the model.
+    """
+
+    app_label = "table"
+
+    def __init__(self) -> None:
+        """Initialize empty registry"""
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._linking = set()
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+    def get_model(self, table):
+        """
+        Return model of table, build it if table is not in registry
+        or its schema version has changed
+        """
+        if table.pk is None:
+            return table.build_model()
+
+        entry = self._entries.get(table.pk)
+        if entry is not None and entry.version >= table.schema_version:
+            self.hits += 1
+            return entry.model
+
+        with self._lock:
+            entry = self._entries.get(table.pk)
+            if entry is not None and entry.version >= table.schema_version:
+                self.hits += 1
+                return entry.model
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self.rebuilds += 1
+                self._evict(table.pk)
+
+            self._linking.add(table.pk)
+            try:
+                # relations are resolved when class is created if their models exist
+                self._build_referenced(table)
+                entry = RegistryEntry(table.schema_version, table.slug)
+                entry.model = table.build_model()
+                self._entries[table.pk] = entry
+                self._build_dependent(table, entry.model)
+            finally:
+                self._linking.discard(table.pk)
+
+            return entry.model
+
+    def get_artifact(self, table, name: str, factory):
+        """
+        Return class derived from schema of table,
+        create it with factory if it is absent for current schema version
+        """
+        model = self.get_model(table)
+        entry = self._entries.get(table.pk)
+        if entry is None or entry.model is not model:
+            return factory()
+
+        if name not in entry.artifacts:
+            with self._lock:
+                if name not in entry.artifacts:
+                    entry.artifacts[name] = factory()
+        return entry.artifacts[name]
+
+    def sync(self, generation: int, tables) -> None:
+        """
+        Drop entries of tables that were changed or deleted
+        since last synchronization. Tables is an iterable of all
+        existing tables
+        """
+        if generation == self.generation:
+            return
+
+        with self._lock:
+            existing_tables = {table.pk: table for table in tables}
+            for table_pk, entry in list(self._entries.items()):
+                table = existing_tables.get(table_pk)
+                if table is not None and table.schema_version == entry.version:
+                    continue
+                self._evict(table_pk)
+            self.generation = generation
+
+    def forget(self, table) -> None:
+        """Remove model of table from registry and django app registry"""
+        with self._lock:
+            self._evict(table.pk)
+            self.unregister(table.slug)
+
+    def unregister(self, model_name: str) -> None:
+        """Remove model from django app registry if it was registered"""
+        if apps.all_models[self.app_label].pop(model_name.lower(), None) is not None:
+            apps.clear_cache()
+
+    def get_stats(self) -> dict[str, int]:
+        """Return counters of registry usage"""
+        return {
+            "models": len(self._entries),
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rebuilds": self.rebuilds,
+        }
+
+    def install(self, app_config) -> None:
+        """
+        Replace models of app in django app registry by LazyModels
+        and channels of ajax_select registry by LazyLookupChannels
+        """
+        models = LazyModels(app_config.models)
+        apps.all_models[app_config.label] = models
+        app_config.models = models
+        lookup_registry._registry = LazyLookupChannels(lookup_registry._registry)
+
+    def _build_referenced(self, table) -> None:
+        """Build models of tables that table refers to"""
+        for related_table in table.get_referenced_tables():
+            if related_table.pk not in self._linking:
+                related_table.get_model()
+
+    def _build_dependent(self, table, model) -> None:
+        """
+        Build models of tables that refer to table, so model has reverse
+        relations. Models that refer to other version of model are rebuilt
+        """
+        for dependent_table in table.get_dependent_tables():
+            if dependent_table.pk in self._linking:
+                continue
+            entry = self._entries.get(dependent_table.pk)
+            if entry is not None and self._is_stale_dependent(entry.model, model):
+                entry.version = -1
+            dependent_table.get_model()
+
+    @staticmethod
+    def _is_stale_dependent(dependent_model, model) -> bool:
+        """Return True if dependent model doesn't refer to model itself"""
+        for field in dependent_model._meta.local_fields:
+            if not field.is_relation:
+                continue
+            related_model = field.related_model
+            if isinstance(related_model, str):
+                if related_model.lower() == f"{model._meta.app_label}.{model._meta.model_name}":
+                    return True
+            elif related_model._meta.db_table == model._meta.db_table and related_model is not model:
+                return True
+        return False
+
+    def _evict(self, table_pk: int) -> None:
+        """Remove entry of table and everything registered from it"""
+        entry = self._entries.pop(table_pk, None)
+        if entry is None:
+            return
+        self.unregister(entry.slug)
+        lookup_registry.register({entry.slug: None})
+
+
+model_registry = DynamicModelRegistry()
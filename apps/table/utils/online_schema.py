@@ -0,0 +1,289 @@
+"""
+Online schema changes of big dynamic tables.
+
+Instead of altering table in place, new schema is applied to
+shadow table, rows are copied there in batches, then tables are swapped.
+
+Ids of objects saved or deleted while table is copied are recorded in
+SchemaChangeRow in the same transaction as the write, and their current
+state is copied to shadow table between batches. Before swap writes to
+the table are blocked, remaining changes and rows inserted after last
+batch are copied, so no write is lost. Imports are refused while schema
+of table is being changed
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, models, transaction, IntegrityError
+
+from table.models import Table, SchemaChangeJob, SchemaChangeRow
+from table.utils.model_registry import model_registry
+from table.utils.row_count import get_row_count
+from table.utils.utils import create_table, get_schema_difference
+
+logger = logging.getLogger(__name__)
+
+MIN_ROWS = getattr(settings, "TABLE_ONLINE_SCHEMA_CHANGE_MIN_ROWS", 100_000)
+BATCH_SIZE = getattr(settings, "TABLE_ONLINE_SCHEMA_CHANGE_BATCH_SIZE", 1000)
+THROTTLE = getattr(settings, "TABLE_ONLINE_SCHEMA_CHANGE_THROTTLE", 0.05)
+
+
+def start_schema_change(table: Table, old_model: models.Model | None) -> SchemaChangeJob | None:
+    """
+    Create online schema change job if table is big enough and
+    its columns were added, removed or altered. Changes of indexes
+    only are applied in place without blocking writes. Must be called
+    in the same transaction that saves columns, so no process builds
+    a model with columns that are not present in db yet
+    """
+    if old_model is None or table.has_dependent_tables():
+        return None
+
+    difference = get_schema_difference(old_model, table.get_model())
+    # changes of attributes that are not stored in db (i.e name) don't alter table
+    schema_editor = connection.SchemaEditorClass(connection)
+    altered = [
+        (old_field, new_field) for old_field, new_field in difference["alter"]
+        if schema_editor._field_should_be_altered(old_field, new_field)
+    ]
+    if not (difference["add"] or difference["remove"] or altered):
+        return None
+    if not _is_table_big(old_model):
+        return None
+
+    old_columns = {field.name for field in old_model._meta.local_fields if not field.primary_key}
+    new_columns = set(table.columns.values_list("slug", flat=True))
+    job = SchemaChangeJob.objects.create(
+        table=table,
+        shadow_table=f"{table.slug}_shadow",
+        pending_columns=sorted(new_columns - old_columns),
+    )
+    table.bump_schema_version()
+    return job
+
+
+def run_in_background(job: SchemaChangeJob) -> threading.Thread:
+    """Run schema change in daemon thread"""
+    thread = threading.Thread(target=OnlineSchemaChange(job).run, daemon=True)
+    thread.start()
+    return thread
+
+
+def record_change(model: models.Model, object_id: int) -> None:
+    """
+    Remember that object was saved or deleted, so schema change copies
+    its state to shadow table. Must be called in transaction of the write
+    """
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        # job could be finished after model was built
+        cursor.execute(
+            f"INSERT INTO {quote_name(SchemaChangeRow._meta.db_table)} (job_id, object_id) "
+            f"SELECT id, %s FROM {quote_name(SchemaChangeJob._meta.db_table)} "
+            f"WHERE id = %s AND status <> %s",
+            [object_id, model.schema_change_id, SchemaChangeJob.Status.DONE],
+        )
+
+
+class OnlineSchemaChange:
+    """Executor of SchemaChangeJob, can resume interrupted job"""
+
+    def __init__(self, job: SchemaChangeJob) -> None:
+        """Initialize executor"""
+        self.job = job
+        self.table = job.table
+        self.db_table = self.table.get_model()._meta.db_table
+
+    def run(self) -> None:
+        """Create shadow table, copy rows and swap tables"""
+        try:
+            self.create_shadow_table()
+            while self.copy_batch():
+                with transaction.atomic(), connection.cursor() as cursor:
+                    while self.apply_changes(cursor):
+                        pass
+                time.sleep(THROTTLE)
+            self.swap()
+        except Exception as error:
+            logger.exception("Schema change of table %s failed", self.table.name)
+            self.job.status = SchemaChangeJob.Status.FAILED
+            self.job.error = str(error)
+            self.job.save(update_fields=["status", "error", "updated_at"])
+        finally:
+            connection.close()
+
+    def create_shadow_table(self) -> None:
+        """Create table with new schema and remember columns to copy"""
+        if self.job.status == SchemaChangeJob.Status.COPYING:
+            return
+
+        shadow_model = self.table.build_model(name=self.job.shadow_table, include_pending=True)
+        try:
+            with connection.schema_editor() as schema_editor:
+                if self.job.shadow_table not in connection.introspection.table_names():
+                    create_table(schema_editor, shadow_model)
+        finally:
+            model_registry.unregister(self.job.shadow_table)
+
+        table_columns = set(self._get_table_columns(self.db_table))
+        self.job.copied_columns = [
+            field.column
+            for field in shadow_model._meta.local_fields
+            if field.column in table_columns
+        ]
+        self.job.rows_total = get_row_count(self.table).value
+        self.job.status = SchemaChangeJob.Status.COPYING
+        self.job.save()
+
+    def copy_batch(self) -> int:
+        """Copy next batch of rows. Return number of rows in batch"""
+        quote_name = connection.ops.quote_name
+        table = quote_name(self.db_table)
+        shadow_table = quote_name(self.job.shadow_table)
+        columns = ", ".join(quote_name(column) for column in self.job.copied_columns)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT {BATCH_SIZE}",
+                [self.job.last_copied_id],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                return 0
+
+            sql = (
+                f"INSERT INTO {shadow_table} ({columns}) "
+                f"SELECT {columns} FROM {table} WHERE id > %s AND id <= %s "
+                f"AND id NOT IN (SELECT id FROM {shadow_table} WHERE id > %s AND id <= %s)"
+            )
+            params = [self.job.last_copied_id, ids[-1]] * 2
+            try:
+                with transaction.atomic():
+                    cursor.execute(sql, params)
+            except IntegrityError:
+                # row was replicated concurrently, copy the rest of batch again
+                with transaction.atomic():
+                    cursor.execute(sql, params)
+
+        self.job.last_copied_id = ids[-1]
+        self.job.rows_copied += len(ids)
+        self.job.save(update_fields=["last_copied_id", "rows_copied", "updated_at"])
+        return len(ids)
+
+    def apply_changes(self, cursor) -> int:
+        """
+        Copy current state of recorded objects to shadow table, deleted
+        objects are removed from it. Return number of applied changes
+        """
+        quote_name = connection.ops.quote_name
+        table = quote_name(self.db_table)
+        shadow_table = quote_name(self.job.shadow_table)
+        changes_table = quote_name(SchemaChangeRow._meta.db_table)
+        columns = ", ".join(quote_name(column) for column in self.job.copied_columns)
+
+        cursor.execute(
+            f"SELECT id, object_id FROM {changes_table} WHERE job_id = %s "
+            f"ORDER BY id LIMIT {BATCH_SIZE}",
+            [self.job.pk],
+        )
+        changes = cursor.fetchall()
+        if not changes:
+            return 0
+
+        object_ids = sorted({object_id for _, object_id in changes})
+        placeholders = ", ".join(["%s"] * len(object_ids))
+        cursor.execute(f"DELETE FROM {shadow_table} WHERE id IN ({placeholders})", object_ids)
+        cursor.execute(
+            f"INSERT INTO {shadow_table} ({columns}) "
+            f"SELECT {columns} FROM {table} WHERE id IN ({placeholders})",
+            object_ids,
+        )
+        cursor.execute(
+            f"DELETE FROM {changes_table} WHERE id IN ({', '.join(['%s'] * len(changes))})",
+            [change_id for change_id, _ in changes],
+        )
+        return len(changes)
+
+    def swap(self) -> None:
+        """
+        Block writes to table, copy remaining changes and rows
+        inserted after last batch, replace table with shadow table
+        and drop old table
+        """
+        quote_name = connection.ops.quote_name
+        old_table = f"{self.db_table}_old"
+        columns = ", ".join(quote_name(column) for column in self.job.copied_columns)
+
+        with self.lock_writes(), connection.cursor() as cursor:
+            while self.apply_changes(cursor):
+                pass
+            cursor.execute(
+                f"INSERT INTO {quote_name(self.job.shadow_table)} ({columns}) "
+                f"SELECT {columns} FROM {quote_name(self.db_table)} WHERE id > %s AND id NOT IN "
+                f"(SELECT id FROM {quote_name(self.job.shadow_table)} WHERE id > %s)",
+                [self.job.last_copied_id] * 2,
+            )
+            if connection.vendor == "mysql":
+                # one statement renames both tables atomically
+                cursor.execute(
+                    f"RENAME TABLE {quote_name(self.db_table)} TO {quote_name(old_table)}, "
+                    f"{quote_name(self.job.shadow_table)} TO {quote_name(self.db_table)}"
+                )
+            else:
+                sql_rename_table = connection.SchemaEditorClass.sql_rename_table
+                for old_name, new_name in ((self.db_table, old_table),
+                                           (self.job.shadow_table, self.db_table)):
+                    cursor.execute(sql_rename_table % {
+                        "old_table": quote_name(old_name),
+                        "new_table": quote_name(new_name),
+                    })
+
+        with connection.schema_editor() as schema_editor:
+            schema_editor.execute(schema_editor.sql_delete_table % {"table": quote_name(old_table)})
+
+        self.job.status = SchemaChangeJob.Status.DONE
+        self.job.pending_columns = []
+        self.job.save()
+        self.job.changed_rows.all().delete()
+        self.table.bump_schema_version()
+
+    @contextmanager
+    def lock_writes(self):
+        """
+        Block writes to table until the end of block. MySQL needs all
+        tables used in block to be locked, LOCK TABLES can't be used in
+        transaction. Other dbs hold lock till the end of transaction,
+        SQLite allows only one writing transaction at all
+        """
+        quote_name = connection.ops.quote_name
+        if connection.vendor == "mysql":
+            tables = (self.db_table, self.job.shadow_table, SchemaChangeRow._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute("LOCK TABLES " + ", ".join(f"{quote_name(table)} WRITE"
+                                                          for table in tables))
+                try:
+                    yield
+                finally:
+                    cursor.execute("UNLOCK TABLES")
+            return
+
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    # reads are allowed, writes wait for swap
+                    cursor.execute(f"LOCK TABLE {quote_name(self.db_table)} IN EXCLUSIVE MODE")
+            yield
+
+    def _get_table_columns(self, db_table: str) -> list[str]:
+        """Return names of columns of table in db"""
+        with connection.cursor() as cursor:
+            description = connection.introspection.get_table_description(cursor, db_table)
+        return [column.name for column in description]
+
+
+def _is_table_big(model: models.Model) -> bool:
+    """Return True if table has at least MIN_ROWS rows"""
+    return model.objects.order_by("pk").values("pk")[MIN_ROWS - 1:MIN_ROWS].exists()
@@ -0,0 +1,86 @@
+"""
+Row counts of dynamic tables.
+Counts are kept in TableRowCount and adjusted on object creation
+and deletion. Counter is recounted when it is older than COUNT_TTL
+seconds, so it doesn't drift forever. Tables that are too big to be
+counted exactly are estimated from database statistics
+"""
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from table.models import Table, TableRowCount
+
+EXACT_COUNT_LIMIT = getattr(settings, "TABLE_EXACT_COUNT_LIMIT", 100_000)
+COUNT_TTL = getattr(settings, "TABLE_ROW_COUNT_TTL", 60 * 60)
+
+STATISTICS_QUERIES = {
+    "mysql": "SELECT TABLE_ROWS FROM information_schema.TABLES "
+             "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+    "postgresql": "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+}
+
+
+class RowCount(NamedTuple):
+    """Number of rows and whether it is exact"""
+
+    value: int
+    is_exact: bool
+
+
+def get_row_count(table: Table) -> RowCount:
+    """
+    Return number of objects in table. Counter is used if it was counted
+    less than COUNT_TTL seconds ago, otherwise table is recounted unless
+    statistics say that table is too big to count. Stale counter of big
+    table is returned as approximate, "manage.py recountrows" recounts it
+    """
+    counter = TableRowCount.objects.filter(table=table).values_list("count", "updated_at").first()
+    if counter is not None and counter[1] > timezone.now() - timedelta(seconds=COUNT_TTL):
+        return RowCount(counter[0], True)
+
+    model = table.get_model()
+    estimate = estimate_row_count(model._meta.db_table)
+    if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+        return RowCount(estimate if counter is None else counter[0], False)
+
+    return RowCount(recount_rows(table), True)
+
+
+def recount_rows(table: Table) -> int:
+    """
+    Count objects of table exactly and store it in counter.
+    Counter is created before counting, so writes committed while
+    table is counted adjust it. Counter row is locked in the same
+    transaction as the count, so writes that adjusted it before
+    are counted and writes that adjust it later are added to the count
+    """
+    TableRowCount.objects.get_or_create(table=table)
+    with transaction.atomic():
+        counter = TableRowCount.objects.select_for_update().get(table=table)
+        counter.count = table.get_model().objects.count()
+        counter.save(update_fields=["count", "updated_at"])
+    return counter.count
+
+
+def adjust_row_count(table: Table, delta: int) -> None:
+    """Add delta to counter of table if it is maintained"""
+    TableRowCount.objects.filter(table_id=table.pk).update(count=F("count") + delta)
+
+
+def estimate_row_count(db_table: str) -> int | None:
+    """Return number of rows in table according to db statistics"""
+    sql = STATISTICS_QUERIES.get(connection.vendor)
+    if sql is None:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
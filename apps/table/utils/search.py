@@ -0,0 +1,247 @@
+"""
+Search of table objects by text columns.
+Backend is chosen by TABLE_SEARCH_BACKEND setting. Built-in n-gram
+backend keeps n-grams of values in SearchNgram index, so substring
+search reads only objects that have all n-grams of query instead
+of scanning whole table
+"""
+from __future__ import annotations
+
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, Count, IntegerField, QuerySet, Value, When
+from django.db.models.functions import Length
+from django.utils.module_loading import import_string
+
+from table.models import Table, Column, SearchNgram, SearchIndexState
+from table.utils.model_registry import model_registry
+
+BACKEND = getattr(settings, "TABLE_SEARCH_BACKEND", "table.utils.search.NgramSearchBackend")
+NGRAM_SIZE = 3
+CHUNK_SIZE = 1000
+
+_backend = None
+
+
+def get_search_backend() -> SearchBackend:
+    """Return search backend configured in settings"""
+    global _backend
+    if _backend is None:
+        _backend = import_string(BACKEND)()
+    return _backend
+
+
+def get_search_columns(table: Table) -> list[Column]:
+    """
+    Return text columns that are searched: searchable column
+    of table and columns with "contains" filter
+    """
+    def build():
+        searchable_column = table.pick_searchable_column(table.get_columns())
+        return [
+            column for column in table.get_columns()
+            if column.dtype == Column.DType.TEXT
+            and (column == searchable_column or "contains" in column.get_filters_names())
+        ]
+    return model_registry.get_artifact(table, "search_columns", build)
+
+
+class SearchBackend:
+    """
+    Base search backend, finds objects by LIKE queries.
+    Backends that keep own index also maintain it on object
+    save and deletion and after imports
+    """
+
+    def search(self, queryset: QuerySet, field_name: str, query: str) -> QuerySet:
+        """
+        Return objects which field contains query ignoring case, ranked:
+        equal values first, then values that start with query, then shorter ones
+        """
+        rank = Case(
+            When(**{f"{field_name}__iexact": query}, then=Value(0)),
+            When(**{f"{field_name}__istartswith": query}, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+        return (
+            self.match(queryset, field_name, query, f"{field_name}__icontains")
+            .annotate(search_rank=rank)
+            .order_by("search_rank", Length(field_name), field_name, "pk")
+        )
+
+    def filter(self, queryset: QuerySet, field_name: str, query: str) -> QuerySet:
+        """Return objects which field contains query, order is kept"""
+        return self.match(queryset, field_name, query, f"{field_name}__contains")
+
+    def match(self, queryset: QuerySet, field_name: str, query: str, lookup: str) -> QuerySet:
+        """Filter objects by lookup"""
+        return queryset.filter(**{lookup: query})
+
+    def index_object(self, object) -> None:
+        """Update index of saved object"""
+
+    def remove_object(self, table: Table, object_id: int) -> None:
+        """Remove deleted object from index"""
+
+    def index_objects(self, table: Table, queryset: QuerySet,
+                      columns: list[Column] | None = None) -> int:
+        """Update index of objects, return number of indexed objects"""
+        return 0
+
+    def rebuild(self, table: Table, columns: list[Column] | None = None) -> int:
+        """Build index of all objects of table, return number of indexed objects"""
+        return 0
+
+    def index_missing_columns(self, table: Table) -> int:
+        """Build index of searched columns that are not indexed yet"""
+        return 0
+
+    def remove_columns(self, table: Table, slugs: list[str]) -> None:
+        """Drop index of columns that were removed or are not searched anymore"""
+
+
+class NgramSearchBackend(SearchBackend):
+    """
+    Search backend with n-gram index in SearchNgram table. Candidates are
+    found by index, then checked by LIKE, so results are exact.
+    Queries shorter than n-gram are searched by LIKE only
+    """
+
+    @staticmethod
+    def get_ngrams(value: str | None) -> set[str]:
+        """Return n-grams of lowercased value"""
+        if not value:
+            return set()
+        value = value.lower()
+        return {value[start:start + NGRAM_SIZE] for start in range(len(value) - NGRAM_SIZE + 1)}
+
+    def match(self, queryset: QuerySet, field_name: str, query: str, lookup: str) -> QuerySet:
+        """Filter objects by lookup among objects that have all n-grams of query"""
+        ngrams = self.get_ngrams(query)
+        if ngrams and self.is_indexed(queryset.model.table, field_name):
+            candidates = (
+                SearchNgram.objects.filter(table_id=queryset.model.table.pk, column=field_name,
+                                           ngram__in=ngrams)
+                .values("object_id")
+                .annotate(matched=Count("ngram", distinct=True))
+                .filter(matched=len(ngrams))
+                .values("object_id")
+            )
+            queryset = queryset.filter(pk__in=candidates)
+        return super().match(queryset, field_name, query, lookup)
+
+    @staticmethod
+    def is_indexed(table: Table, field_name: str) -> bool:
+        """Return True if index of column is complete"""
+        return SearchIndexState.objects.filter(table_id=table.pk, column=field_name).exists()
+
+    def index_object(self, object) -> None:
+        """Replace n-grams of object"""
+        columns = get_search_columns(object.table)
+        if columns:
+            self.write(object.table, columns, [
+                [object.pk] + [getattr(object, column.slug) for column in columns]
+            ])
+
+    def remove_object(self, table: Table, object_id: int) -> None:
+        """Delete n-grams of object"""
+        SearchNgram.objects.filter(table_id=table.pk, object_id=object_id).delete()
+
+    def index_objects(self, table: Table, queryset: QuerySet,
+                      columns: list[Column] | None = None) -> int:
+        """Replace n-grams of objects, objects are read in chunks"""
+        columns = get_search_columns(table) if columns is None else columns
+        if not columns:
+            return 0
+
+        rows, count = [], 0
+        values = queryset.order_by("pk").values_list("pk", *[column.slug for column in columns])
+        for row in values.iterator(chunk_size=CHUNK_SIZE):
+            rows.append(row)
+            if len(rows) >= CHUNK_SIZE:
+                count += self.write(table, columns, rows)
+                rows = []
+        if rows:
+            count += self.write(table, columns, rows)
+        return count
+
+    def rebuild(self, table: Table, columns: list[Column] | None = None) -> int:
+        """
+        Drop n-grams of columns and index all objects of table.
+        Columns are marked as indexed when all objects are indexed
+        """
+        columns = get_search_columns(table) if columns is None else columns
+        slugs = [column.slug for column in columns]
+        SearchIndexState.objects.filter(table_id=table.pk, column__in=slugs).delete()
+        entries = SearchNgram.objects.filter(table_id=table.pk)
+        if columns != get_search_columns(table):
+            entries = entries.filter(column__in=slugs)
+        entries.delete()
+        count = self.index_objects(table, table.get_model().objects.all(), columns)
+        SearchIndexState.objects.bulk_create(
+            [SearchIndexState(table_id=table.pk, column=slug) for slug in slugs]
+        )
+        return count
+
+    def index_missing_columns(self, table: Table) -> int:
+        """Build index of searched columns that are not marked as indexed"""
+        indexed = set(
+            SearchIndexState.objects.filter(table_id=table.pk).values_list("column", flat=True)
+        )
+        columns = [column for column in get_search_columns(table) if column.slug not in indexed]
+        if not columns:
+            return 0
+        return self.rebuild(table, columns)
+
+    def remove_columns(self, table: Table, slugs: list[str]) -> None:
+        """Delete n-grams of columns and mark them as not indexed"""
+        SearchIndexState.objects.filter(table_id=table.pk, column__in=slugs).delete()
+        SearchNgram.objects.filter(table_id=table.pk, column__in=slugs).delete()
+
+    def write(self, table: Table, columns: list[Column], rows: list) -> int:
+        """Replace n-grams of columns of rows, row is id followed by values of columns"""
+        slugs = [column.slug for column in columns]
+        entries = [
+            SearchNgram(table_id=table.pk, column=slug, object_id=row[0], ngram=ngram)
+            for row in rows
+            for slug, value in zip(slugs, row[1:])
+            for ngram in self.get_ngrams(value)
+        ]
+        with transaction.atomic():
+            SearchNgram.objects.filter(table_id=table.pk, column__in=slugs,
+                                       object_id__in=[row[0] for row in rows]).delete()
+            SearchNgram.objects.bulk_create(entries, batch_size=CHUNK_SIZE)
+        return len(rows)
+
+
+def index_new_columns(table: Table, old_columns: list[Column]) -> threading.Thread | None:
+    """
+    Index objects by columns that became searched after table change.
+    Index is built in background thread, until it is built
+    these columns are searched without index. Index of columns
+    that are not searched anymore is dropped
+    """
+    old_slugs = {column.slug for column in old_columns}
+    search_columns = get_search_columns(table)
+    unsearched = old_slugs - {column.slug for column in search_columns}
+    if unsearched:
+        get_search_backend().remove_columns(table, sorted(unsearched))
+    columns = [column for column in search_columns if column.slug not in old_slugs]
+    if not columns:
+        return None
+
+    def build():
+        try:
+            get_search_backend().rebuild(table, columns)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=build, daemon=True)
+    thread.start()
+    return thread
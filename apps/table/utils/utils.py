@@ -1,18 +1,211 @@
 """Utils for dynamic tables migration"""
+import logging
+
+from django.contrib.contenttypes.models import ContentType
 from django.core.management import call_command
+from django.db import connection, models, transaction, DatabaseError
+
+from table.models import Table, SchemaGeneration, TableDependency
+from table.utils.model_registry import model_registry
+from table.utils.search import get_search_backend
 
-from table.models import Table
+logger = logging.getLogger(__name__)
 
 
 def migrate():
     """
-    Migrate dynamic tables changes (creation, deletion altering) 
-    to db
+    Migrate static apps changes to db.
+    Dynamic models are unmanaged, so their schema is not
+    touched by migrations, use migrate_table instead.
+    Dependency graph of tables is rebuilt afterwards and
+    search index is built for columns that are not indexed.
+
+    Older versions recorded dynamic models as managed in migrations
+    of "table" app. They are loaded here, so migrations only mark them
+    as unmanaged (AlterModelOptions) instead of deleting their tables.
+    After upgrade run "manage.py safemigrate" before deleting any table
     """
 
-    # load all tables models so syncdb knows about them
+    # dynamic models missing from state would be deleted by migrations
     for table in Table.objects.all():
         table.get_model()
 
     call_command("makemigrations", interactive=False)
     call_command("migrate", interactive=False)
+    TableDependency.rebuild()
+    backend = get_search_backend()
+    for table in Table.objects.all():
+        backend.index_missing_columns(table)
+
+
+def get_schema_difference(old_model: models.Model,
+                          new_model: models.Model) -> dict[str, list]:
+    """
+    Compare fields of two versions of dynamic model.
+    Return dict with added and removed fields, and pairs
+    of (old, new) fields that were changed. Pairs of fields
+    whose index was only added or dropped are returned separately
+    """
+    old_fields = _get_columns_fields(old_model)
+    new_fields = _get_columns_fields(new_model)
+
+    altered, indexed = [], []
+    for name in old_fields.keys() & new_fields.keys():
+        old_field, new_field = old_fields[name], new_fields[name]
+        old_definition, new_definition = old_field.deconstruct()[1:], new_field.deconstruct()[1:]
+        if old_definition == new_definition:
+            continue
+        if _without_index(old_definition) == _without_index(new_definition):
+            indexed.append((old_field, new_field))
+        else:
+            altered.append((old_field, new_field))
+
+    return {
+        "add": [field for name, field in new_fields.items() if name not in old_fields],
+        "remove": [field for name, field in old_fields.items() if name not in new_fields],
+        "alter": altered,
+        "index": indexed,
+    }
+
+
+def migrate_table(table: Table, old_model: models.Model | None = None) -> None:
+    """
+    Apply schema changes of one table to db. Only columns that
+    were added, removed or changed since old_model are altered.
+    If there is no old model table is created. Indexes are updated
+    after current transaction is committed.
+    On db without transactional DDL steps that were applied before
+    failed one are undone in reverse order, so table stays as it was
+    """
+    new_model = table.get_model()
+    # each applied step adds function that reverts it
+    undo = []
+
+    try:
+        with connection.schema_editor() as schema_editor:
+            if old_model is None:
+                create_table(schema_editor, new_model)
+                undo.append(lambda editor: editor.delete_model(new_model))
+                # content type makes table available for relations
+                ContentType.objects.get_for_model(new_model)
+                return
+
+            old_table, new_table = old_model._meta.db_table, new_model._meta.db_table
+            if old_table != new_table:
+                schema_editor.alter_db_table(new_model, old_table, new_table)
+                undo.append(lambda editor: editor.alter_db_table(new_model, new_table, old_table))
+
+            difference = get_schema_difference(old_model, new_model)
+            # data of removed column is lost, undo recreates it empty
+            for field in difference["remove"]:
+                schema_editor.remove_field(old_model, field)
+                undo.append(lambda editor, field=field: editor.add_field(old_model, field))
+            for field in difference["add"]:
+                schema_editor.add_field(new_model, field)
+                undo.append(lambda editor, field=field: editor.remove_field(new_model, field))
+            for old_field, new_field in difference["alter"]:
+                schema_editor.alter_field(new_model, old_field, new_field)
+                undo.append(lambda editor, old_field=old_field, new_field=new_field:
+                            editor.alter_field(new_model, new_field, old_field))
+    except DatabaseError:
+        if not connection.features.can_rollback_ddl:
+            _undo_schema_changes(undo)
+        raise
+
+    transaction.on_commit(lambda: update_indexes(new_model, difference["index"]))
+
+
+def _undo_schema_changes(undo: list) -> None:
+    """Revert applied schema changes from the last one"""
+    with connection.schema_editor() as schema_editor:
+        for step in reversed(undo):
+            try:
+                step(schema_editor)
+            except DatabaseError:
+                logger.exception("Schema change of table can't be reverted")
+
+
+def has_transactional_ddl() -> bool:
+    """
+    Return True if schema changes can be run in transaction with other
+    queries and rolled back. SQLite can roll back DDL, but its schema
+    editor can't be used inside atomic block
+    """
+    return connection.features.can_rollback_ddl and connection.vendor != "sqlite"
+
+
+def restore_columns(table: Table, columns: list) -> None:
+    """
+    Return columns of table to saved state: columns that are not
+    in saved ones are deleted, saved ones are recreated or reverted
+    """
+    with transaction.atomic():
+        for column in table.columns.exclude(pk__in=[column.pk for column in columns]):
+            column.delete()
+        for column in columns:
+            column.save()
+
+
+def update_indexes(model: models.Model, fields: list[tuple[models.Field, models.Field]]) -> None:
+    """
+    Create or drop indexes of (old, new) fields whose db_index was changed.
+    Indexes are built without blocking writes where db supports it:
+    PostgreSQL builds them concurrently, MySQL (InnoDB) builds them in place
+    """
+    if not fields:
+        return
+
+    options = {"concurrently": True} if connection.vendor == "postgresql" else {}
+    # concurrent index can't be built inside transaction
+    with connection.schema_editor(atomic=False) as schema_editor:
+        for old_field, new_field in fields:
+            if new_field.db_index:
+                schema_editor.execute(
+                    schema_editor._create_index_sql(model, fields=[new_field], **options)
+                )
+                continue
+            index_names = schema_editor._constraint_names(model, [old_field.column], index=True,
+                                                          type_=models.Index.suffix)
+            for index_name in index_names:
+                schema_editor.execute(schema_editor._delete_index_sql(model, index_name, **options))
+
+
+def create_table(schema_editor, model: models.Model) -> None:
+    """
+    Create table of dynamic model with indexes of its fields.
+    Schema editor doesn't create indexes of unmanaged models itself
+    """
+    schema_editor.create_model(model)
+    for field in model._meta.local_fields:
+        schema_editor.deferred_sql.extend(schema_editor._field_indexes_sql(model, field))
+
+
+def drop_table(model: models.Model) -> None:
+    """Remove table of dynamic model from db"""
+    with connection.schema_editor() as schema_editor:
+        schema_editor.delete_model(model)
+
+
+def sync_schema():
+    """
+    Drop dynamic models and classes derived from them if
+    schema was changed by other process
+    """
+    generation = SchemaGeneration.current()
+    if generation != model_registry.generation:
+        model_registry.sync(generation, Table.objects.all())
+
+
+def _without_index(definition: tuple) -> tuple:
+    """Return deconstructed field without db_index option"""
+    path, args, kwargs = definition
+    return path, args, {key: value for key, value in kwargs.items() if key != "db_index"}
+
+
+def _get_columns_fields(model: models.Model) -> dict[str, models.Field]:
+    """Return fields of model made from columns"""
+    return {
+        field.name: field
+        for field in model._meta.local_fields
+        if not field.primary_key
+    }
@@ -1,7 +1,4 @@
 """Views of table app"""
-import os
-import time
-import openpyxl
 from typing import Any
 from datetime import datetime
 from django.conf import settings
@@ -10,29 +7,40 @@ from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import QuerySet
 from django.forms import BaseModelForm
-from django.http import HttpRequest, HttpResponse
+from django.http import (HttpRequest, HttpResponse, StreamingHttpResponse, FileResponse,
+                         Http404, QueryDict)
 
-from django.apps.registry import apps
 from django.shortcuts import redirect
 from django.urls import reverse_lazy, reverse
 from django.utils.encoding import smart_str
 from django.utils.safestring import mark_safe
 from django.views import View
 from django.views.generic.list import ListView
-from django.views.generic.edit import CreateView, UpdateView, DeleteView
-from django.db import transaction
+from django.views.generic.detail import DetailView
+from django.views.generic.base import TemplateView
+from django.views.generic.edit import CreateView, UpdateView, DeleteView, FormView
+from django.db import DatabaseError, transaction
 from django.contrib import messages
 from markupsafe import Markup
 
-from table.models import Table, Column
+from table.models import Table, Column, ExportJob, TableImport
 from user.models import TablePermission
-from table.forms import TableForm, ColumnFormSet, TableFilter
-from logs.utils import log
+from table.forms import TableForm, ColumnFormSet, TableFilter, ImportForm
+from logs.models import Logs
+from logs.utils import log, get_object_values, get_changes
 from apps.core.utils import IsUserAdminMixin
 
 from apps.core.utils import BaseJSONEncoder
-from apps.logs.utils import get_difference_dict
-from apps.table.utils.utils import migrate
+from apps.core.pagination import CursorPaginator, CountedPaginator
+from table.utils.row_count import get_row_count
+from apps.table.utils.utils import (migrate_table, drop_table, restore_columns,
+                                     has_transactional_ddl)
+from table.utils.model_registry import model_registry
+from table.utils.online_schema import start_schema_change, run_in_background
+from table.utils.export import EXPORTERS, SYNC_LIMIT as EXPORT_SYNC_LIMIT, queue_export
+from table.utils.importer import TableImporter
+from table.utils.search import get_search_columns, index_new_columns
+from table.utils import global_search
 
 
 class DasboardView(View):
@@ -81,28 +89,67 @@ class SaveTableMixin:
         columns_form = context["columns_form"]
         if any(error for error in columns_form.errors[:-1]):
             return self.form_invalid(form)
-        with transaction.atomic():
-            self.object = form.save(commit=True)
-            columns_form.instance = self.object
-            columns = []
-            for column_form in columns_form.forms:
-                if column_form.is_valid():
-                    column = column_form.save(commit=False)
-                    column.table = self.object
-                    column.save()
-                    columns.append(column)
-            for column in self.object.columns.all():
-                if column not in columns:
-                    column.delete()
-
-        migrate()
-        self.object.register_ajax_lookup()
+        if self.object and self.object.get_active_schema_change():
+            messages.error(self.request, "Table schema is being changed, try again later")
+            return self.form_invalid(form)
+        old_model = self.object.get_model() if self.object else None
+        old_search_columns = get_search_columns(self.object) if self.object else []
+        old_columns = list(self.object.columns.all()) if self.object else []
+        old_object = self.object
+        # without transactional DDL columns are restored if schema change fails
+        transactional_ddl = has_transactional_ddl()
+        try:
+            with transaction.atomic():
+                self.object = form.save(commit=True)
+                columns_form.instance = self.object
+                columns = []
+                for column_form in columns_form.forms:
+                    if column_form.is_valid():
+                        column = column_form.save(commit=False)
+                        column.table = self.object
+                        column.save()
+                        columns.append(column)
+                for column in self.object.columns.all():
+                    if column not in columns:
+                        column.delete()
+                schema_change = start_schema_change(self.object, old_model)
+                if not schema_change and transactional_ddl:
+                    migrate_table(self.object, old_model)
+
+            if schema_change:
+                run_in_background(schema_change)
+            elif not transactional_ddl:
+                self._migrate_or_restore(old_model, old_columns)
+        except DatabaseError as error:
+            if self.object.pk is not None:
+                model_registry.forget(self.object)
+            self.object = old_object
+            messages.error(self.request, f"Table schema can't be changed: {error}")
+            return self.form_invalid(form)
+
+        index_new_columns(self.object, old_search_columns)
         return super().form_valid(form)
 
     def form_invalid(self, form):
         """If form is not valid"""
         return super().form_invalid(form)
 
+    def _migrate_or_restore(self, old_model, old_columns: list[Column]) -> None:
+        """
+        Apply committed schema changes to db. If they fail, applied
+        changes are undone by migrate_table and columns are restored,
+        new table is deleted
+        """
+        try:
+            migrate_table(self.object, old_model)
+        except DatabaseError:
+            if old_model is None:
+                ContentType.objects.filter(model=self.object.slug).delete()
+                self.object.delete()
+            else:
+                restore_columns(self.object, old_columns)
+            raise
+
 
 class TableCreateView(SaveTableMixin, CreateView):
     """Edit dynamic table"""
@@ -136,6 +183,8 @@ class TableUpdateView(SaveTableMixin, UpdateView):
         )
         context["dtypes"] = Column.HANDLERS
         context["table"] = self.object
+        context["schema_change"] = self.object.get_active_schema_change()
+        context["indexes"] = self.object.get_indexes()
         return context
 
 
@@ -152,8 +201,12 @@ class HasPermissionMixin:
         if request.user.has_permission(self.operation, self.table):
             return http_response
         else:
-            messages.error(request, "You have no permission to access this page")
-            return redirect(self.get_reject_url())
+            return self.reject(request)
+
+    def reject(self, request) -> HttpResponse:
+        """Redirect user who has no permission"""
+        messages.error(request, "You have no permission to access this page")
+        return redirect(self.get_reject_url())
 
     def get_reject_url(self) -> None:
         """Return reserve to which redirect if has no permission"""
@@ -167,13 +220,21 @@ class TableObjectListView(HasPermissionMixin, ListView):
     paginate_by = 10
     table = None
     formset = None
+    displayable_columns = None
     operation = TablePermission.Operation.READ
 
     table_id_kwarg = "table_id"
 
+    pagination_param = "pagination"
+    sort_param = "sort"
+    cursor_param = "cursor"
+    count_from_table = True
+
     def get(self, request,  *args, **kwargs):
         """List all objects in the table"""
         self.configure_view()
+        self.displayable_columns = self.table.get_displayable_columns(request.user)
+        self.queryset = self.table.optimize_queryset(self.queryset, self.displayable_columns)
         return super().get(request, *args, **kwargs)
 
     def configure_view(self):
@@ -185,11 +246,70 @@ class TableObjectListView(HasPermissionMixin, ListView):
     def get_queryset(self):
         return self.queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate by cursor if it was requested and objects are sorted
+        by indexed column, otherwise by page number
+        """
+        if not self.is_cursor_pagination():
+            sort_column = self.get_sort_column()
+            if sort_column is not None:
+                queryset = queryset.order_by(sort_column.slug, "pk")
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, self.get_sort_field(), self.cursor_param)
+        page = paginator.page(self.request.GET.get(self.cursor_param), self.request.GET)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        """
+        Return paginator. Number of objects of unfiltered table is
+        taken from table's row count instead of counting them
+        """
+        if not self.count_from_table or self.is_filtered():
+            return super().get_paginator(queryset, per_page, orphans,
+                                         allow_empty_first_page, **kwargs)
+
+        row_count = get_row_count(self.table)
+        return CountedPaginator(queryset, per_page, row_count.value, row_count.is_exact,
+                                orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+                                **kwargs)
+
+    def is_filtered(self) -> bool:
+        """Return True if any filter of filterset is applied"""
+        return any(self.request.GET.get(name) for name in self.formset.form.fields)
+
+    def is_cursor_pagination(self) -> bool:
+        """
+        Return True if cursor pagination is turned on by settings or request.
+        Objects sorted by column without index are paginated by page number,
+        because seeking by such column scans whole table
+        """
+        mode = self.request.GET.get(self.pagination_param, settings.TABLE_PAGINATION_MODE)
+        if mode != "cursor":
+            return False
+        sort_column = self.get_sort_column()
+        return sort_column is None or sort_column.handler.is_indexed()
+
+    def get_sort_column(self) -> Column | None:
+        """Return column to sort objects by, None if objects are sorted by primary key"""
+        sort = self.request.GET.get(self.sort_param)
+        if not sort:
+            return None
+        return next((column for column in self.table.get_columns() if column.slug == sort), None)
+
+    def get_sort_field(self) -> str:
+        """Return field to sort objects by, primary key by default"""
+        sort_column = self.get_sort_column()
+        return sort_column.slug if sort_column is not None else "pk"
+
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         """Modify rendering context"""
         context = super().get_context_data(**kwargs)
         context["table"] = self.table
         context["filter"] = self.formset
+        context["displayable_columns"] = self.displayable_columns
         context['related_tables'] = self.table.get_dependent_tables()
         return context
 
@@ -207,6 +327,7 @@ class RelatedTableObjectsListView(TableObjectListView):
     table_id_kwarg = "related_table_id"
     parent_table_kwarg = "table_id"
     object_pk_kwarg = "object_id"
+    count_from_table = False
 
     def configure_view(self):
         self.parent_table = Table.objects.get(pk=self.kwargs.get(self.parent_table_kwarg))
@@ -215,6 +336,8 @@ class RelatedTableObjectsListView(TableObjectListView):
 
     def get_queryset(self) -> QuerySet:
         """Fetch related to table objects"""
+        if self.queryset is not None:
+            return self.queryset
         return self.parent_table.get_related_objects_of_table(self.table, self.table_object)
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
@@ -249,11 +372,11 @@ class TableDeleteView(IsUserAdminMixin, DeleteView):
         return context
 
     def form_valid(self, form):
-        del apps.all_models['table'][self.object.slug]
         self.content_type = ContentType.objects.get(model=self.object.slug)
+        model = self.object.get_model()
         self._delete_related_models()
         result = super().form_valid(form)
-        migrate()
+        drop_table(model)
         return result
 
     def _is_deletion_safe(self) -> bool:
@@ -261,7 +384,7 @@ class TableDeleteView(IsUserAdminMixin, DeleteView):
         Check if there is no dependencies of this table
         Return the list of names of tables that depend on this table
         """
-        return not bool(self.object.get_dependent_tables())
+        return not self.object.has_dependent_tables()
 
     def _delete_related_models(self) -> None:
         """Delete instances of ContentType, Permission and TablePermission"""
@@ -303,8 +426,6 @@ class DynamicModelViewMixin(HasPermissionMixin):
 
     def get(self, request, table_id: int, *args, **kwargs):
         """Get method for object creationg"""
-        for table in Table.objects.all():
-            table.register_ajax_lookup()
         self.setup_view(table_id)
         return super().get(request=request, table_id=table_id, *args, **kwargs)
 
@@ -328,12 +449,8 @@ class DynamicModelViewMixin(HasPermissionMixin):
         return context
 
     def dump_object(self) -> dict:
-        """Convert current state of object to str"""
-        object_dict = {
-            column.name: getattr(self.object, column.slug)
-            for column in self.table.columns.all()
-        }
-        return object_dict
+        """Return values of columns of object by their slugs"""
+        return get_object_values(self.object)
 
 
 class TableObjectCreateView(DynamicModelViewMixin, CreateView):
@@ -348,6 +465,8 @@ class TableObjectCreateView(DynamicModelViewMixin, CreateView):
             table=self.table,
             object_id=self.object.id,
             message="Created object",
+            action=Logs.Action.CREATE,
+            changes=get_changes({}, self.dump_object()),
         )
         return response
 
@@ -367,14 +486,15 @@ class TableObjectEditView(DynamicModelViewMixin, UpdateView):
 
     def form_valid(self, form: BaseModelForm) -> HttpResponse:
         response = super().form_valid(form)
-        after_update = self.dump_object()
-        before_update, after_update = get_difference_dict(self.before_update, after_update)
+        changes = get_changes(self.before_update, self.dump_object())
         log(
             user=self.request.user,
             table=self.table,
             object_id=self.object.id,
             message="Changed object",
-            description=f"Changed object from {before_update} -> {after_update}",
+            description=f"Changed {len(changes)} column(s) of object",
+            action=Logs.Action.UPDATE,
+            changes=changes,
         )
         return response
 
@@ -404,13 +524,13 @@ class TableObjectDeleteView(DynamicModelViewMixin, DeleteView):
         return context
 
     def form_valid(self, *args, **kwargs):
-        before_deletions = self.dump_object()
         log(
             user=self.request.user,
             table=self.table,
             object_id=self.object.id,
             message="Deleted object",
-            description=f"Deleted object {before_deletions}",
+            action=Logs.Action.DELETE,
+            changes=get_changes(self.dump_object(), {}),
         )
         return super().form_valid(*args, **kwargs)
 
@@ -446,26 +566,157 @@ class TableObjectDeleteView(DynamicModelViewMixin, DeleteView):
 
 
 class ExportTableDataView(TableObjectListView):
-    """Import table data view"""
+    """
+    Export table data view. Small tables are streamed in response,
+    exports of big tables are run in background
+    """
+
+    format_param = "format"
+    default_format = "xlsx"
 
     def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
         self.configure_view()
 
-        workbook = openpyxl.Workbook()
-        worksheet = workbook.active
+        format = request.GET.get(self.format_param, self.default_format)
+        exporter_class = EXPORTERS.get(format)
+        if exporter_class is None:
+            raise Http404("Unknown export format")
 
-        worksheet.append(("Id", ) + tuple(column.name for column in self.table.columns.all()))
+        if get_row_count(self.table).value > EXPORT_SYNC_LIMIT:
+            return redirect(queue_export(self.table, request.user, format, self.get_filter_query()))
 
-        for object in self.queryset:
-            worksheet.append((object.id,) + tuple(str(object.get_repr_of(column))
-                                                  for column in self.table.columns.all())
-                             )
-        path = os.path.join(settings.MEDIA_ROOT, f"{time.time_ns()}.xlsx")
-        name = f"{self.table.name}_export_on_{datetime.now().strftime('%Y-%m-%d %H:%M')}.xlsx"
+        columns = self.table.get_columns()
+        queryset = self.table.optimize_queryset(self.queryset, columns)
+        exporter = exporter_class(self.table, queryset, columns)
+        name = (f"{self.table.name}_export_on_{datetime.now().strftime('%Y-%m-%d %H:%M')}"
+                f".{exporter.extension}")
 
-        workbook.save(path)
-
-        response = HttpResponse(open(path, 'rb'), content_type='application/force-download')
+        response = StreamingHttpResponse(exporter.stream(), content_type=exporter.content_type)
         response['Content-Disposition'] = 'attachment; filename=%s' % smart_str(name)
 
         return response
+
+    def get_filter_query(self) -> str:
+        """Return querystring of applied filters only, in order of filterset fields"""
+        query = QueryDict(mutable=True)
+        for name in self.formset.form.fields:
+            values = [value for value in self.request.GET.getlist(name) if value]
+            if values:
+                query.setlist(name, values)
+        return query.urlencode()
+
+
+class ExportJobView(HasPermissionMixin, DetailView):
+    """Show progress of background export"""
+
+    model = ExportJob
+    template_name = "table/export_job.html"
+    pk_url_kwarg = "export_id"
+    context_object_name = "export"
+    operation = TablePermission.Operation.READ
+
+    table = None
+
+    def get_object(self, queryset=None) -> ExportJob:
+        """Return export of table from url"""
+        self.table = Table.objects.get(pk=self.kwargs.get("table_id"))
+        return super().get_object(self.table.exports.all())
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["table"] = self.table
+        return context
+
+
+class ExportJobDownloadView(ExportJobView):
+    """Download file of finished export"""
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        self.object = self.get_object()
+        if self.object.status != ExportJob.Status.DONE:
+            return redirect(self.object)
+        return FileResponse(self.object.file.open("rb"), as_attachment=True,
+                            filename=self.object.name)
+
+
+class TableImportView(HasPermissionMixin, FormView):
+    """Import objects to table from CSV or XLSX file"""
+
+    template_name = "table/import_form.html"
+    form_class = ImportForm
+    operation = TablePermission.Operation.WRITE
+
+    table = None
+
+    def setup(self, request: HttpRequest, *args, **kwargs) -> None:
+        """Set table of view"""
+        super().setup(request, *args, **kwargs)
+        self.table = Table.objects.get(pk=kwargs.get("table_id"))
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Check permission before form is handled, because import
+        writes objects while handling it
+        """
+        if not request.user.has_permission(self.operation, self.table):
+            return self.reject(request)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_reject_url(self) -> str:
+        return reverse("object-list", args=[self.table.id])
+
+    def form_valid(self, form: ImportForm) -> HttpResponse:
+        file = form.cleaned_data["file"]
+        table_import = TableImporter(self.table, self.request.user).run(file, file.name)
+        return redirect(table_import)
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["table"] = self.table
+        return context
+
+
+class TableImportDetailView(HasPermissionMixin, DetailView):
+    """Show summary of import"""
+
+    model = TableImport
+    template_name = "table/import_detail.html"
+    pk_url_kwarg = "import_id"
+    context_object_name = "table_import"
+    operation = TablePermission.Operation.WRITE
+
+    table = None
+
+    def get_object(self, queryset=None) -> TableImport:
+        """Return import of table from url"""
+        self.table = Table.objects.get(pk=self.kwargs.get("table_id"))
+        return super().get_object(self.table.imports.all())
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["table"] = self.table
+        return context
+
+
+class TableImportReportView(TableImportDetailView):
+    """Download rows that failed to import"""
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        self.object = self.get_object()
+        if not self.object.error_report:
+            return redirect(self.object)
+        return FileResponse(self.object.error_report.open("rb"), as_attachment=True,
+                            filename=f"{self.object.file_name}_errors.csv")
+
+
+class GlobalSearchView(TemplateView):
+    """Search objects in all tables user can read"""
+
+    template_name = "table/search.html"
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get("q", "").strip()
+        context["query"] = query
+        context["results"] = global_search.search(self.request.user, query) if query else []
+        return context
@@ -8,6 +8,8 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 
+from user.permissions import PermissionMatrix
+
 
 class Role(models.Model):
     """Role model"""
@@ -29,6 +31,8 @@ class User(AbstractUser):
     permissions = models.ManyToManyField("TablePermission")
     is_staff = models.BooleanField(default=True)
 
+    _permission_matrix = None
+
     def __str__(self):
         return self.username
 
@@ -48,29 +52,20 @@ class User(AbstractUser):
         """Return has permission of that operation with accept status"""
         if self.is_superuser:
             return True
-
-        content_type = ContentType.objects.get_for_model(object)
-        permissions = self.permissions.filter(
-            object_id=object.id, operation=operation, content_type=content_type
-        )
-
-        if permissions.exists():
-            return permissions.first().accept
-
-        group_permissions = [
-            group.permissions.filter(
-                content_type=content_type, object_id=object.id, operation=operation
-            )
-            for group in self.user_groups.all()
-        ]
-
-        for group_permission in group_permissions:
-            if group_permission.exists():
-                return group_permission.first().accept
-
-        if content_type.model == "table":
-            return False
-        return True
+        return self.get_permission_matrix().has_permission(operation, object)
+
+    def get_permission_matrix(self) -> PermissionMatrix:
+        """
+        Return permissions of user and its groups.
+        Matrix is taken from cache once per user instance, i.e once per request
+        """
+        if self._permission_matrix is None:
+            self._permission_matrix = PermissionMatrix.get(self)
+        return self._permission_matrix
+
+    def reset_permission_matrix(self) -> None:
+        """Drop loaded permissions, so they are reloaded on next check"""
+        self._permission_matrix = None
 
 
 class UserGroups(models.Model):
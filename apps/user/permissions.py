@@ -0,0 +1,96 @@
+"""Resolving of users' TablePermissions"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db import transaction
+
+
+class PermissionMatrix:
+    """
+    All TablePermissions of user loaded at once.
+    Permissions are keyed by (content_type_id, object_id, operation),
+    user's permissions have priority over group's ones
+    """
+
+    TABLE_MODEL = "table"
+    CACHE_ALIAS = getattr(settings, "PERMISSION_CACHE_ALIAS", "default")
+    CACHE_TIMEOUT = getattr(settings, "PERMISSION_CACHE_TIMEOUT", 300)
+
+    def __init__(self, user_permissions: dict, group_permissions: dict) -> None:
+        """Initialize matrix"""
+        self.user_permissions = user_permissions
+        self.group_permissions = group_permissions
+
+    @classmethod
+    def get(cls, user) -> PermissionMatrix:
+        """Return matrix of user from cache, load it on cache miss"""
+        cache = caches[cls.CACHE_ALIAS]
+        key = cls.get_cache_key(user.pk)
+        matrix = cache.get(key)
+        if matrix is None:
+            matrix = cls.load(user)
+            cache.set(key, matrix, cls.CACHE_TIMEOUT)
+        return matrix
+
+    @classmethod
+    def invalidate(cls, user_ids) -> None:
+        """
+        Remove cached matrices of users. Matrices are removed once
+        more after commit, in case they were reloaded by other request
+        before the change was committed
+        """
+        keys = [cls.get_cache_key(user_id) for user_id in user_ids]
+        if not keys:
+            return
+        cache = caches[cls.CACHE_ALIAS]
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def get_cache_key(user_id: int) -> str:
+        """Return cache key of user's matrix"""
+        return f"table_permissions:{user_id}"
+
+    @classmethod
+    def load(cls, user) -> PermissionMatrix:
+        """Load user's and user's groups permissions in two queries"""
+        from user.models import TablePermission
+
+        fields = ("content_type_id", "object_id", "operation", "type")
+        user_rows = (
+            TablePermission.objects.filter(user=user)
+            .order_by("id")
+            .values_list(*fields)
+        )
+        group_rows = (
+            TablePermission.objects.filter(usergroups__users=user)
+            .order_by("usergroups__id", "id")
+            .values_list(*fields)
+        )
+        return cls(cls._compile(user_rows), cls._compile(group_rows))
+
+    def has_permission(self, operation: int, object) -> bool:
+        """Return has permission of that operation with accept status"""
+        content_type = ContentType.objects.get_for_model(object)
+        key = (content_type.id, object.id, operation)
+
+        if key in self.user_permissions:
+            return self.user_permissions[key]
+        if key in self.group_permissions:
+            return self.group_permissions[key]
+
+        return content_type.model != self.TABLE_MODEL
+
+    @staticmethod
+    def _compile(rows) -> dict[tuple[int, int, int], bool]:
+        """Convert permission rows to lookup dict, first row of key wins"""
+        from user.models import TablePermission
+
+        permissions = {}
+        for content_type_id, object_id, operation, permission_type in rows:
+            key = (content_type_id, object_id, operation)
+            if key not in permissions:
+                permissions[key] = permission_type == TablePermission.Type.ACCEPT
+        return permissions
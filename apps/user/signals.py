@@ -0,0 +1,77 @@
+"""
+Signals of user app. Invalidate cached permissions of users
+whose TablePermissions or groups were changed
+"""
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from user.models import User, UserGroups, TablePermission
+from user.permissions import PermissionMatrix
+
+CHANGING_ACTIONS = ("post_add", "post_remove", "pre_clear")
+
+
+def get_users_of_permissions(permission_ids) -> set[int]:
+    """Return ids of users that have permissions directly or through groups"""
+    direct = User.objects.filter(permissions__in=permission_ids).values_list("pk", flat=True)
+    through_groups = User.objects.filter(
+        user_groups__permissions__in=permission_ids
+    ).values_list("pk", flat=True)
+    return set(direct) | set(through_groups)
+
+
+def get_users_of_groups(group_ids) -> set[int]:
+    """Return ids of users of groups"""
+    return set(User.objects.filter(user_groups__in=group_ids).values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=User.permissions.through)
+def user_permissions_changed(instance, action, reverse, pk_set, **kwargs):
+    """Permissions were granted to user or taken from them"""
+    if action not in CHANGING_ACTIONS:
+        return
+    if not reverse:
+        PermissionMatrix.invalidate([instance.pk])
+    elif action == "pre_clear":
+        PermissionMatrix.invalidate(get_users_of_permissions([instance.pk]))
+    else:
+        PermissionMatrix.invalidate(pk_set)
+
+
+@receiver(m2m_changed, sender=UserGroups.permissions.through)
+def group_permissions_changed(instance, action, reverse, pk_set, **kwargs):
+    """Permissions were granted to group or taken from it"""
+    if action not in CHANGING_ACTIONS:
+        return
+    if not reverse:
+        PermissionMatrix.invalidate(get_users_of_groups([instance.pk]))
+    elif action == "pre_clear":
+        PermissionMatrix.invalidate(get_users_of_permissions([instance.pk]))
+    else:
+        PermissionMatrix.invalidate(get_users_of_groups(pk_set))
+
+
+@receiver(m2m_changed, sender=UserGroups.users.through)
+def group_users_changed(instance, action, reverse, pk_set, **kwargs):
+    """Users were added to group or removed from it"""
+    if action not in CHANGING_ACTIONS:
+        return
+    if reverse:
+        PermissionMatrix.invalidate([instance.pk])
+    elif action == "pre_clear":
+        PermissionMatrix.invalidate(get_users_of_groups([instance.pk]))
+    else:
+        PermissionMatrix.invalidate(pk_set)
+
+
+@receiver(post_save, sender=TablePermission)
+@receiver(pre_delete, sender=TablePermission)
+def table_permission_changed(instance, **kwargs):
+    """TablePermission was edited or is going to be deleted"""
+    PermissionMatrix.invalidate(get_users_of_permissions([instance.pk]))
+
+
+@receiver(pre_delete, sender=UserGroups)
+def group_deleted(instance, **kwargs):
+    """Group is going to be deleted, its users lose its permissions"""
+    PermissionMatrix.invalidate(get_users_of_groups([instance.pk]))
@@ -57,6 +57,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "apps.user.middleware.CheckAuthenticated",
+    "apps.table.middleware.SchemaSyncMiddleware",
 ]
 
 
@@ -120,6 +121,21 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Local memory cache is per process, use shared backend (redis, memcached)
+# when running several workers, so permission changes are seen by all of them
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+PERMISSION_CACHE_ALIAS = "default"
+PERMISSION_CACHE_TIMEOUT = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -172,6 +188,64 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
+# Pagination of table objects: "page" (page numbers and counts)
+# or "cursor" (keyset pagination without counts)
+
+TABLE_PAGINATION_MODE = "page"
+
+# Tables with more rows (by db statistics) are not counted exactly.
+# Maintained row counts are recounted after TABLE_ROW_COUNT_TTL seconds
+
+TABLE_EXACT_COUNT_LIMIT = 100_000
+TABLE_ROW_COUNT_TTL = 60 * 60
+
+# Tables with more rows are exported in background. Exports are run by
+# thread pool of web process, set TABLE_EXPORT_WORKERS = 0 to run them
+# only by "manage.py runexports --loop" worker. Finished exports are
+# removed after TABLE_EXPORT_TTL seconds. Running exports without progress
+# for TABLE_EXPORT_STALE_AFTER seconds are taken over by runexports
+
+TABLE_EXPORT_SYNC_LIMIT = 10_000
+TABLE_EXPORT_WORKERS = 2
+TABLE_EXPORT_TTL = 24 * 60 * 60
+TABLE_EXPORT_STALE_AFTER = 10 * 60
+
+# Number of imported rows validated and inserted in one transaction
+
+TABLE_IMPORT_BATCH_SIZE = 1000
+
+# "manage.py bulkload" commits TABLE_BULK_LOAD_CHUNK_SIZE rows at once and
+# uses TABLE_BULK_LOAD_WORKERS processes, each with its own db connection
+
+TABLE_BULK_LOAD_CHUNK_SIZE = 10_000
+TABLE_BULK_LOAD_WORKERS = 4
+
+# Backend of autocomplete and "contains" filters of text columns.
+# NgramSearchBackend keeps n-gram index of values in db, SearchBackend
+# uses plain LIKE queries. Run "manage.py rebuildsearchindex" after
+# switching to backend with index
+
+TABLE_SEARCH_BACKEND = "table.utils.search.NgramSearchBackend"
+
+# Search indexes of saved and deleted objects are updated by background
+# thread in batches of TABLE_INDEX_BATCH_SIZE objects, buffered objects
+# are indexed at least every TABLE_INDEX_FLUSH_INTERVAL seconds
+
+TABLE_INDEX_BATCH_SIZE = 100
+TABLE_INDEX_FLUSH_INTERVAL = 1.0
+
+# Autocomplete results are cached in each process for TABLE_LOOKUP_CACHE_TTL
+# seconds, at most TABLE_LOOKUP_CACHE_SIZE queries are kept
+
+TABLE_LOOKUP_CACHE_SIZE = 1000
+TABLE_LOOKUP_CACHE_TTL = 30
+
+# Logs are written in batches of LOGS_BATCH_SIZE by background thread,
+# buffered logs are written at least every LOGS_FLUSH_INTERVAL seconds
+
+LOGS_BATCH_SIZE = 100
+LOGS_FLUSH_INTERVAL = 1.0
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 